@@ -0,0 +1,76 @@
+"""Game archive write throughput benchmark.
+
+Submits finished games to a GameArchive backed by a temporary SQLite file
+and measures how many games per second the background writer commits.
+
+Run with: python -m benchmarks.archive
+"""
+
+from pathlib import Path
+import random
+import sqlite3
+import tempfile
+import time
+
+from src.server.archive import GameArchive, GameRecord
+from src.server.room import encode_move
+
+
+GAMES = 50_000
+MOVES_PER_GAME = 80
+
+
+def _random_game(rng: random.Random, index: int) -> GameRecord:
+    moves = b"".join(
+        encode_move(rng.randrange(64), rng.randrange(64))
+        for _ in range(MOVES_PER_GAME)
+    )
+    ended_at = time.time()
+    return GameRecord(
+        room_id=f"room-{index}",
+        white=f"player-{rng.randrange(10_000)}",
+        black=f"player-{rng.randrange(10_000)}",
+        white_rating=rng.randint(100, 3500),
+        black_rating=rng.randint(100, 3500),
+        base=300.0,
+        increment=3.0,
+        started_at=ended_at - 600,
+        ended_at=ended_at,
+        result=rng.choice(["1-0", "0-1", "1/2-1/2"]),
+        reason="checkmate",
+        moves=moves,
+    )
+
+
+def main() -> None:
+    rng = random.Random(42)
+    games = [_random_game(rng, index) for index in range(GAMES)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "games.sqlite3"
+        archive = GameArchive(path, max_queue=GAMES)
+        archive.start()
+
+        start = time.perf_counter()
+        for game in games:
+            archive.submit(game)
+        submit_elapsed = time.perf_counter() - start
+
+        archive.stop()
+        total_elapsed = time.perf_counter() - start
+
+        with sqlite3.connect(path) as db:
+            (stored,) = db.execute("SELECT COUNT(*) FROM games").fetchone()
+
+    print(
+        f"submit: {GAMES:,} games in {submit_elapsed:.3f}s "
+        f"({submit_elapsed / GAMES * 1e6:.2f} us per game on the caller)"
+    )
+    print(
+        f"commit: {stored:,} games ({MOVES_PER_GAME} moves each) in "
+        f"{total_elapsed:.3f}s ({stored / total_elapsed:,.0f} games/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Matchmaking throughput benchmark.
+
+Fills one pool with 100k waiting players, then measures how fast arrivals
+are paired against it and how long a full re-pairing sweep takes.
+
+Run with: python -m benchmarks.matchmaking
+"""
+
+import random
+import time
+
+from src.server.matchmaking import MatchmakingPool, WaitingPlayer
+
+
+QUEUED_PLAYERS = 100_000
+ARRIVALS = 50_000
+TIME_CONTROL = (300.0, 3.0)
+
+
+def main() -> None:
+    rng = random.Random(42)
+    pool = MatchmakingPool()
+    now = 0.0
+
+    start = time.perf_counter()
+    for key in range(QUEUED_PLAYERS):
+        pool.add(WaitingPlayer(key, rng.randint(100, 3500), TIME_CONTROL, now))
+    elapsed = time.perf_counter() - start
+    print(
+        f"insert: {QUEUED_PLAYERS:,} players in {elapsed:.3f}s "
+        f"({QUEUED_PLAYERS / elapsed:,.0f}/s)"
+    )
+
+    # Arrivals pair with the nearest-rated queued player (lookup + removal)
+    paired = 0
+    start = time.perf_counter()
+    for key in range(QUEUED_PLAYERS, QUEUED_PLAYERS + ARRIVALS):
+        rating = rng.randint(100, 3500)
+        opponent = pool.find_match(rating, 0.0, now)
+        if opponent is not None:
+            pool.remove(opponent.key)
+            paired += 1
+        else:
+            pool.add(WaitingPlayer(key, rating, TIME_CONTROL, now))
+    elapsed = time.perf_counter() - start
+    print(
+        f"pair: {ARRIVALS:,} arrivals ({paired:,} paired) in {elapsed:.3f}s "
+        f"({ARRIVALS / elapsed:,.0f}/s, {elapsed / ARRIVALS * 1e6:.2f} us each), "
+        f"{len(pool):,} still queued"
+    )
+
+    # Removal of arbitrary players (disconnects)
+    keys = rng.sample(range(QUEUED_PLAYERS), QUEUED_PLAYERS // 10)
+    start = time.perf_counter()
+    removed = sum(pool.remove(key) is not None for key in keys)
+    elapsed = time.perf_counter() - start
+    print(f"remove: {removed:,} disconnects in {elapsed:.3f}s")
+
+    # Periodic sweep once everybody's window has widened
+    waiting = len(pool)
+    start = time.perf_counter()
+    pairs = pool.match_waiting(now + 60.0)
+    elapsed = time.perf_counter() - start
+    print(f"sweep: {waiting:,} waiting, {len(pairs):,} pairs in {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
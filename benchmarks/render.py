@@ -0,0 +1,180 @@
+"""Headless render benchmark for the game screen.
+
+Runs GameState with SDL's dummy video driver (no window, no GPU) through
+scripted scenarios and reports per-frame time percentiles for the whole
+frame and for each renderer it calls. Every frame is a full redraw, like
+the first frame of a game, so the numbers are the worst case the dirty
+rect path can hit.
+
+Run with: python -m benchmarks.render
+"""
+
+import os
+
+# Must be set before pygame creates the display
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import time
+
+import pygame
+
+from src.utils import settings
+
+
+FRAMES = 500
+# Renderer methods timed separately, by label
+TIMED_METHODS = (
+    ("board", "board_renderer", "draw"),
+    ("highlights", "board_renderer", "draw_highlights"),
+    ("pieces", "piece_renderer", "draw_board"),
+    ("dragged piece", "piece_renderer", "draw_at"),
+    ("promotion modal", "promotion_modal", "render"),
+    ("game over overlay", "game_over_notification", "render"),
+)
+
+
+def _square(name: str) -> tuple[int, int]:
+    """Board (row, col) of an algebraic square, e.g. "e2" -> (6, 4)."""
+
+    return 8 - int(name[1]), ord(name[0]) - ord("a")
+
+
+def _play(state, moves: str) -> None:
+    for move in moves.split():
+        if state.session.play_move(_square(move[:2]), _square(move[2:4])) is None:
+            raise ValueError(f"illegal scripted move {move}")
+
+
+def _square_center(row: int, col: int) -> tuple[int, int]:
+    return (
+        settings.START_GRID_BOARD_POS[0] + col * settings.TILESIZE + settings.TILESIZE // 2,
+        settings.START_GRID_BOARD_POS[1] + row * settings.TILESIZE + settings.TILESIZE // 2,
+    )
+
+
+def _idle(state):
+    return None
+
+
+def _dragging(state):
+    # Pick up the e2 pawn, then move it around the board one step per frame
+    state.handle_event(
+        pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=_square_center(*_square("e2")))
+    )
+    size = settings.TILESIZE * 8
+
+    def step(frame):
+        x = settings.START_GRID_BOARD_POS[0] + frame * 7 % size
+        y = settings.START_GRID_BOARD_POS[1] + frame * 3 % size
+        state.handle_event(
+            pygame.event.Event(pygame.MOUSEMOTION, pos=(x, y), rel=(7, 3), buttons=(1, 0, 0))
+        )
+
+    return step
+
+
+def _promotion(state):
+    # White pawn takes on b8 and waits for the promotion choice
+    _play(state, "a2a4 b7b5 a4b5 a7a6 b5a6 h7h6 a6a7 h6h5 a7b8")
+    return None
+
+
+def _game_over(state):
+    # Fool's mate
+    _play(state, "f2f3 e7e5 g2g4 d8h4")
+    return None
+
+
+def _flipped(state):
+    # Black at the bottom, with a knight selected so its moves are highlighted
+    _play(state, "e2e4")
+    state.session.handle_board_click(*_square("g8"))
+    return None
+
+
+# (name, local color, setup); setup may return a per-frame step(frame)
+SCENARIOS = (
+    ("idle board", None, _idle),
+    ("dragging", None, _dragging),
+    ("promotion modal", None, _promotion),
+    ("game over overlay", None, _game_over),
+    ("flipped board", "black", _flipped),
+)
+
+
+def _timed(owner, method_name: str, samples: list[float]) -> None:
+    """Replace owner.method_name with a wrapper appending its duration (ms) to `samples`."""
+
+    method = getattr(owner, method_name)
+
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            samples.append((time.perf_counter() - start) * 1000)
+
+    setattr(owner, method_name, wrapper)
+
+
+def _percentiles(samples: list[float]) -> str:
+    ordered = sorted(samples)
+
+    def at(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    return (
+        f"p50 {at(0.50):7.3f}  p90 {at(0.90):7.3f}  p99 {at(0.99):7.3f}"
+        f"  max {ordered[-1]:7.3f} ms"
+    )
+
+
+def _run_scenario(screen, local_color, setup) -> dict[str, list[float]]:
+    from src.core.chess_session import LocalChessSession
+    from src.core.state_manager import StateManager
+    from src.states.game_state import GameState
+
+    manager = StateManager()
+    state = GameState(manager, LocalChessSession(local_color))
+    manager.change_state(state)
+    step = setup(state)
+
+    samples = {"frame": []}
+    for label, owner_name, method_name in TIMED_METHODS:
+        samples[label] = []
+        _timed(getattr(state, owner_name), method_name, samples[label])
+
+    for frame in range(FRAMES):
+        if step is not None:
+            step(frame)
+        start = time.perf_counter()
+        screen.fill(settings.BACKGROUND_COLOR_RGB)
+        state.render(screen)
+        samples["frame"].append((time.perf_counter() - start) * 1000)
+
+    return samples
+
+
+def main() -> None:
+    pygame.init()
+    settings.initialize_display_settings()
+    screen = pygame.display.set_mode((settings.WIDTH, settings.HEIGHT))
+    print(
+        f"{settings.WIDTH}x{settings.HEIGHT}, tile {settings.TILESIZE}px, "
+        f"{FRAMES} full-redraw frames per scenario "
+        f"(video driver: {pygame.display.get_driver()})"
+    )
+
+    for name, local_color, setup in SCENARIOS:
+        samples = _run_scenario(screen, local_color, setup)
+        print(f"\n{name}")
+        for label, values in samples.items():
+            if values:
+                print(f"  {label:<18} {_percentiles(values)}")
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
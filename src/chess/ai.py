@@ -6,12 +6,16 @@ from stockfish import Stockfish
 
 from src.utils import settings
 from src.chess.board import Board
-from src.chess.pieces.king import King
-from src.chess.pieces.rook import Rook
+from src.chess.fen import board_to_fen
 
 
 Coord = Tuple[int, int]
 MoveCoords = Tuple[Coord, Coord]
+# A move with the piece a pawn promotes to (None if it does not promote)
+AiMove = Tuple[Coord, Coord, Optional[str]]
+
+# UCI promotion suffix -> piece kind
+PROMOTION_KINDS = {"q": "queen", "r": "rook", "b": "bishop", "n": "knight"}
 
 
 class AiEngine:
@@ -20,7 +24,8 @@ class AiEngine:
     This class is responsible only for:
     - holding a Stockfish instance
     - translating our Board into FEN
-    - translating a UCI move (e2e4) into (row, col) coordinates
+    - translating a UCI move (e2e4, e7e8n) into (row, col) coordinates
+      and a promotion piece
     """
 
     def __init__(self, color: str, elo: int = 1350) -> None:
@@ -36,7 +41,7 @@ class AiEngine:
         board: Board,
         side_to_move: str,
         time_limit_ms: int = 1000,
-    ) -> Optional[MoveCoords]:
+    ) -> Optional[AiMove]:
         """Ask Stockfish for a move for the given side.
 
         :param board: Current Board instance.
@@ -45,10 +50,12 @@ class AiEngine:
         :param time_limit_ms: Time limit hint in milliseconds (not all
                               Stockfish Python bindings use it; we fall back
                               to get_best_move() if needed).
-        :return: ((from_row, from_col), (to_row, to_col)) or None if no move.
+        :return: ((from_row, from_col), (to_row, to_col), promotion) or None
+                 if no move; promotion is the piece kind the engine chose
+                 ("queen", "knight"...) or None.
         """
 
-        fen = _board_to_fen(board, side_to_move)
+        fen = board_to_fen(board, side_to_move)
         self.sf.set_fen_position(fen)
 
         # Some versions expose get_best_move_time, others only get_best_move.
@@ -61,91 +68,8 @@ class AiEngine:
         if not move_str:
             return None
 
-        return _uci_to_coords(move_str)
-
-
-def _board_to_fen(board: Board, color: str) -> str:
-    """Convert internal Board representation to a FEN string.
-
-    This includes:
-    - piece placement from our 8x8 array
-    - active color ("w" or "b")
-    - basic castling rights inferred from king/rook has_moved flags
-    - en-passant and move counters simplified ("- 0 1")
-    """
-
-    rows = []
-    for row in range(8):  # 0 (black back rank) -> 7 (white back rank)
-        empty = 0
-        row_str = ""
-        for col in range(8):
-            piece = board.get_piece(row, col)
-            if piece is None:
-                empty += 1
-                continue
-
-            if empty > 0:
-                row_str += str(empty)
-                empty = 0
-
-            kind = piece.kind
-            if kind == "pawn":
-                letter = "p"
-            elif kind == "rook":
-                letter = "r"
-            elif kind == "knight":
-                letter = "n"
-            elif kind == "bishop":
-                letter = "b"
-            elif kind == "queen":
-                letter = "q"
-            elif kind == "king":
-                letter = "k"
-            else:
-                letter = "?"
-
-            if piece.color == "white":
-                letter = letter.upper()
-
-            row_str += letter
-
-        if empty > 0:
-            row_str += str(empty)
-        rows.append(row_str)
-
-    placement = "/".join(rows)
-
-    active_color = "w" if color == "white" else "b"
-
-    rights = []
-
-    # White castling
-    wk = board.get_piece(7, 4)
-    if isinstance(wk, King) and not wk.has_moved:
-        wr_h = board.get_piece(7, 7)
-        wr_a = board.get_piece(7, 0)
-        if isinstance(wr_h, Rook) and not wr_h.has_moved:
-            rights.append("K")
-        if isinstance(wr_a, Rook) and not wr_a.has_moved:
-            rights.append("Q")
-
-    # Black castling
-    bk = board.get_piece(0, 4)
-    if isinstance(bk, King) and not bk.has_moved:
-        br_h = board.get_piece(0, 7)
-        br_a = board.get_piece(0, 0)
-        if isinstance(br_h, Rook) and not br_h.has_moved:
-            rights.append("k")
-        if isinstance(br_a, Rook) and not br_a.has_moved:
-            rights.append("q")
-
-    castling = "".join(rights) if rights else "-"
-
-    en_passant = "-"
-    halfmove = 0
-    fullmove = 1
-
-    return f"{placement} {active_color} {castling} {en_passant} {halfmove} {fullmove}"
+        from_square, to_square = _uci_to_coords(move_str)
+        return from_square, to_square, _uci_promotion(move_str)
 
 
 def _uci_to_coords(move: str) -> MoveCoords:
@@ -170,3 +94,8 @@ def _uci_to_coords(move: str) -> MoveCoords:
 
     return (from_row, from_col), (to_row, to_col)
 
+
+def _uci_promotion(move: str) -> Optional[str]:
+    """Piece kind of a UCI promotion suffix (e.g. 'e7e8n' -> 'knight'), else None."""
+
+    return PROMOTION_KINDS.get(move[4:5])
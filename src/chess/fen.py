@@ -0,0 +1,93 @@
+from src.chess.board import Board
+from src.chess.pieces.king import King
+from src.chess.pieces.rook import Rook
+
+
+def board_to_fen(board: Board, color: str) -> str:
+    """Convert internal Board representation to a FEN string.
+
+    This includes:
+    - piece placement from our 8x8 array
+    - active color ("w" or "b")
+    - basic castling rights inferred from king/rook has_moved flags
+    - en-passant and move counters simplified ("- 0 1")
+    """
+
+    rows = []
+    for row in range(8):  # 0 (black back rank) -> 7 (white back rank)
+        empty = 0
+        row_str = ""
+        for col in range(8):
+            piece = board.get_piece(row, col)
+            if piece is None:
+                empty += 1
+                continue
+
+            if empty > 0:
+                row_str += str(empty)
+                empty = 0
+
+            kind = piece.kind
+            if kind == "pawn":
+                letter = "p"
+            elif kind == "rook":
+                letter = "r"
+            elif kind == "knight":
+                letter = "n"
+            elif kind == "bishop":
+                letter = "b"
+            elif kind == "queen":
+                letter = "q"
+            elif kind == "king":
+                letter = "k"
+            else:
+                letter = "?"
+
+            if piece.color == "white":
+                letter = letter.upper()
+
+            row_str += letter
+
+        if empty > 0:
+            row_str += str(empty)
+        rows.append(row_str)
+
+    placement = "/".join(rows)
+
+    active_color = "w" if color == "white" else "b"
+
+    rights = []
+
+    # White castling
+    wk = board.get_piece(7, 4)
+    if isinstance(wk, King) and not wk.has_moved:
+        wr_h = board.get_piece(7, 7)
+        wr_a = board.get_piece(7, 0)
+        if isinstance(wr_h, Rook) and not wr_h.has_moved:
+            rights.append("K")
+        if isinstance(wr_a, Rook) and not wr_a.has_moved:
+            rights.append("Q")
+
+    # Black castling
+    bk = board.get_piece(0, 4)
+    if isinstance(bk, King) and not bk.has_moved:
+        br_h = board.get_piece(0, 7)
+        br_a = board.get_piece(0, 0)
+        if isinstance(br_h, Rook) and not br_h.has_moved:
+            rights.append("k")
+        if isinstance(br_a, Rook) and not br_a.has_moved:
+            rights.append("q")
+
+    castling = "".join(rights) if rights else "-"
+
+    en_passant = "-"
+    halfmove = 0
+    fullmove = 1
+
+    return f"{placement} {active_color} {castling} {en_passant} {halfmove} {fullmove}"
+
+
+def square_name(row: int, col: int) -> str:
+    """Algebraic name of a board square: (7, 4) -> "e1"."""
+
+    return f"{chr(ord('a') + col)}{8 - row}"
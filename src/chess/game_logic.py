@@ -1,10 +1,42 @@
+import copy
+from typing import NamedTuple
+
 from src.chess.pieces.pawn import Pawn
 from src.chess.pieces.queen import Queen
 from src.chess.pieces.rook import Rook
 from src.chess.pieces.bishop import Bishop
 from src.chess.pieces.knight import Knight
+from src.chess.pieces.king import King
 
 from src.chess.board import Board
+from src.chess.move_stack import MoveRecord, MoveStack, pack_move
+
+
+# Piece class by kind, to put captured pieces back on undo
+PIECE_CLASSES = {
+    "pawn": Pawn,
+    "knight": Knight,
+    "bishop": Bishop,
+    "rook": Rook,
+    "queen": Queen,
+    "king": King,
+}
+
+
+class MoveResult(NamedTuple):
+    """Outcome of GameLogic.apply_move."""
+
+    piece_kind: str
+    color: str
+    from_square: tuple[int, int]
+    to_square: tuple[int, int]
+    promotion: str | None
+    capture: bool
+    castling: bool
+    en_passant: bool
+    # The side to move after this move is in check
+    check: bool
+    game_over: bool
 
 
 class GameLogic:
@@ -25,7 +57,13 @@ class GameLogic:
         self.pending_promotion: tuple[str, int, int] | None = None
         # For draw detection
         self.halfmove_clock = 0  # Fifty-move rule counter
-        self.position_history: list[str] = [self.board.get_position_hash()]  # For threefold repetition (starts with initial position)
+        # Every ply as a packed record (undo/redo) plus position keys (threefold repetition)
+        self.move_stack = MoveStack(self._position_key())
+        # Bumped on every change of the position; precomputed legal moves are
+        # only used for the version they were computed for
+        self.position_version = 0
+        # (position_version, {(row, col): legal targets}) for the side to move
+        self._precomputed_moves: tuple[int, dict] | None = None
 
     def select_square(self, row, col):
         piece = self.board.get_piece(row, col)
@@ -33,39 +71,7 @@ class GameLogic:
         if self.selected_piece is None:
             if piece and piece.color == self.current_turn:
                 self.selected_piece = piece
-
-                # Start with the basic pseudo-legal moves for the piece
-                base_moves = piece.valid_moves(self.board)
-
-                # Filter out moves that would leave this side's king in check
-                self.valid_moves = self._get_legal_moves_for_moves(piece, base_moves)
-
-                # Castling: add king-side/queen-side castling squares if available
-                if piece.kind == "king":
-                    castle_moves = self._get_castling_moves_for_king(piece)
-                    self.valid_moves.extend(castle_moves)
-
-                # En passant: add special capture square to pawn moves based on last move
-                if isinstance(piece, Pawn) and self.last_move is not None:
-                    last_piece, from_row, _, to_row, to_col = self.last_move
-
-                    if (
-                        isinstance(last_piece, Pawn)
-                        and last_piece.color != piece.color
-                        and abs(to_row - from_row) == 2  # moved two squares
-                        and to_row == row  # on the same rank as our pawn
-                        and abs(to_col - col) == 1  # adjacent file
-                    ):
-                        ep_row = row + piece.direction
-                        ep_col = to_col
-                        if self.board.is_inside(ep_row, ep_col) and self.board.is_empty(
-                            ep_row, ep_col
-                        ):
-                            # It must also be a legal move (not leave our king in check)
-                            if (ep_row, ep_col) in self._get_legal_moves_for_moves(
-                                piece, [(ep_row, ep_col)]
-                            ):
-                                self.valid_moves.append((ep_row, ep_col))
+                self.valid_moves = self.legal_moves_for(piece)
             return
 
         if (row, col) in self.valid_moves:
@@ -74,18 +80,197 @@ class GameLogic:
         self.selected_piece = None
         self.valid_moves = []
 
+    def legal_moves_for(self, piece) -> list[tuple[int, int]]:
+        """Legal target squares of `piece` (of the side to move).
+
+        Read from the precomputed moves when they are up to date for this
+        position; otherwise (e.g. a click right after the move) computed now.
+        """
+
+        precomputed = self._precomputed_moves
+        if precomputed is not None and precomputed[0] == self.position_version:
+            return list(precomputed[1].get(piece.position, ()))
+        return self._compute_legal_moves(piece)
+
+    def _compute_legal_moves(self, piece) -> list[tuple[int, int]]:
+        # Pseudo-legal moves that do not leave this side's king in check
+        moves = [
+            (to_row, to_col)
+            for to_row, to_col in piece.valid_moves(self.board)
+            if not self._move_leaves_king_in_check(piece, to_row, to_col)
+        ]
+
+        # Castling: add king-side/queen-side castling squares if available
+        if piece.kind == "king":
+            moves.extend(self._get_castling_moves_for_king(piece))
+
+        # En passant: add special capture square to pawn moves based on last move
+        ep_square = self._en_passant_square(piece)
+        if ep_square is not None and not self._move_leaves_king_in_check(piece, *ep_square):
+            moves.append(ep_square)
+
+        return moves
+
+    def snapshot(self) -> "GameLogic":
+        """A copy of the position with its own board, safe to read on another thread.
+
+        Meant for all_legal_moves(): history lists are shared, not copied.
+        """
+
+        snapshot = copy.copy(self)
+        snapshot.board = self.board.clone()
+        snapshot.selected_piece = None
+        snapshot.valid_moves = []
+        return snapshot
+
+    def all_legal_moves(self) -> dict[tuple[int, int], list[tuple[int, int]]]:
+        """Legal targets of every piece of the side to move, by origin square."""
+
+        moves = {}
+        for row in range(8):
+            for col in range(8):
+                piece = self.board.get_piece(row, col)
+                if piece is not None and piece.color == self.current_turn:
+                    moves[(row, col)] = self._compute_legal_moves(piece)
+        return moves
+
+    def store_precomputed_moves(self, version: int, moves: dict) -> None:
+        """Keep all_legal_moves() of a snapshot taken at `version` (ignored if stale)."""
+
+        if version == self.position_version:
+            self._precomputed_moves = (version, moves)
+
+    def _en_passant_square(self, piece):
+        """Square where `piece` (a pawn) can capture en passant right now, if any."""
+
+        if not isinstance(piece, Pawn) or self.last_move is None:
+            return None
+
+        row, col = piece.position
+        last_piece, from_row, _, to_row, to_col = self.last_move
+
+        if (
+            isinstance(last_piece, Pawn)
+            and last_piece.color != piece.color
+            and abs(to_row - from_row) == 2  # moved two squares
+            and to_row == row  # on the same rank as our pawn
+            and abs(to_col - col) == 1  # adjacent file
+        ):
+            ep_row = row + piece.direction
+            ep_col = to_col
+            if self.board.is_inside(ep_row, ep_col) and self.board.is_empty(ep_row, ep_col):
+                return (ep_row, ep_col)
+        return None
+
+    def apply_move(self, from_square, to_square, promotion: str | None = None):
+        """Validate and play one move from a non-UI source (network, engine, replay).
+
+        Unlike two select_square() calls, only the requested move is checked:
+        it must be one of the piece's pseudo-legal targets (plus castling and
+        en passant), and the king safety test is done for that move alone,
+        in place on the board instead of on a clone per candidate. The UI
+        selection is left alone. If the move promotes, `promotion` is applied
+        in the same call; without it the promotion stays pending.
+
+        Returns a MoveResult, or None if the move is not legal.
+        """
+
+        if self.game_over or self.pending_promotion is not None:
+            return None
+
+        from_row, from_col = from_square
+        to_row, to_col = to_square
+        if not (self.board.is_inside(from_row, from_col) and self.board.is_inside(to_row, to_col)):
+            return None
+
+        piece = self.board.get_piece(from_row, from_col)
+        if piece is None or piece.color != self.current_turn:
+            return None
+
+        en_passant = False
+        castling = False
+        if (to_row, to_col) in piece.valid_moves(self.board):
+            pass
+        elif self._en_passant_square(piece) == (to_row, to_col):
+            en_passant = True
+        elif piece.kind == "king" and (to_row, to_col) in self._get_castling_moves_for_king(piece):
+            # Castling already checks every square the king crosses
+            castling = True
+        else:
+            return None
+
+        if not castling and self._move_leaves_king_in_check(piece, to_row, to_col):
+            return None
+
+        capture = en_passant or self.board.get_piece(to_row, to_col) is not None
+
+        # A selection of the side that just moved can no longer be played
+        if self.selected_piece is not None and self.selected_piece.color == piece.color:
+            self.selected_piece = None
+            self.valid_moves = []
+
+        self._move_piece(piece, to_row, to_col)
+        if self.pending_promotion is not None and promotion is not None:
+            self.promote_pawn(promotion)
+
+        return MoveResult(
+            piece_kind=piece.kind,
+            color=piece.color,
+            from_square=(from_row, from_col),
+            to_square=(to_row, to_col),
+            promotion=promotion if piece.kind == "pawn" and to_row in (0, 7) else None,
+            capture=capture,
+            castling=castling,
+            en_passant=en_passant,
+            check=self.pending_promotion is None and self.is_in_check(),
+            game_over=self.game_over,
+        )
+
+    def _move_leaves_king_in_check(self, piece, to_row, to_col) -> bool:
+        """Make the move on the real board, test the king, then take it back."""
+
+        board = self.board
+        from_row, from_col = piece.position
+        target = board.get_piece(to_row, to_col)
+
+        # En passant removes a pawn that is not on the target square
+        ep_captured = None
+        if piece.kind == "pawn" and to_col != from_col and target is None:
+            ep_captured = board.get_piece(from_row, to_col)
+            board.remove_piece(from_row, to_col)
+
+        board.remove_piece(from_row, from_col)
+        board.place_piece(piece, to_row, to_col)
+        try:
+            return self._king_in_check_after(board, piece.color)
+        finally:
+            board.remove_piece(to_row, to_col)
+            board.place_piece(piece, from_row, from_col)
+            if target is not None:
+                board.place_piece(target, to_row, to_col)
+            if ep_captured is not None:
+                board.place_piece(ep_captured, from_row, to_col)
+
     def _move_piece(self, piece, row, col):
+        self.position_version += 1
         from_row, from_col = piece.position
         target = self.board.get_piece(row, col)
+        # For the move record
+        had_moved = piece.has_moved
+        halfmove_clock = self.halfmove_clock
+        captured = target
 
         # Reset last-move flags and detect capture
         was_capture = False
+        was_en_passant = False
 
         # en passant: indirect capture
         if isinstance(piece, Pawn) and col != from_col and target is None:
             captured_row = from_row
+            captured = self.board.get_piece(captured_row, col)
             self.board.remove_piece(captured_row, col)
             was_capture = True
+            was_en_passant = True
 
         if target:
             self.board.remove_piece(row, col)
@@ -127,26 +312,34 @@ class GameLogic:
         # Reset to 0 on pawn move or capture, otherwise increment
         if isinstance(piece, Pawn) or target:
             self.halfmove_clock = 0
-            # Also reset position history when capture/pawn move occurs (threefold repetition resets)
-            self.position_history = [self.board.get_position_hash()]
         else:
             self.halfmove_clock += 1
-        
+
+        # The promotion, if any, is filled in by promote_pawn()
+        self.move_stack.push(
+            pack_move(
+                MoveRecord(
+                    from_square=from_row * 8 + from_col,
+                    to_square=row * 8 + col,
+                    kind=piece.kind,
+                    color=piece.color,
+                    captured=captured.kind if captured else None,
+                    promotion=None,
+                    castling=was_castling,
+                    en_passant=was_en_passant,
+                    had_moved=had_moved,
+                    captured_had_moved=captured.has_moved if captured else False,
+                    halfmove_clock=halfmove_clock,
+                )
+            ),
+            self._position_key(),
+        )
+
         # Do not advance turn or check mate/stalemate if waiting for promotion choice
         if self.pending_promotion is not None:
             return
 
         self.current_turn = "black" if self.current_turn == "white" else "white"
-        
-        # Track position for threefold repetition (only if no reset above)
-        if self.halfmove_clock > 0:  # Only track if not in reset state
-            pos_hash = self.board.get_position_hash()
-            self.position_history.append(pos_hash)
-            
-            # Keep history limited to avoid memory bloat
-            # Only keep the last 100 positions (since fifty-move rule caps at 100 halfmoves anyway)
-            if len(self.position_history) > 200:
-                self.position_history = self.position_history[-200:]
 
         if self._is_checkmate(self.current_turn):
             self.game_over = True
@@ -169,6 +362,7 @@ class GameLogic:
             return
 
         color, row, col = self.pending_promotion
+        self.position_version += 1
 
         # Remove the pawn and create the new piece
         self.board.remove_piece(row, col)
@@ -191,16 +385,9 @@ class GameLogic:
         self.pending_promotion = None
 
         self.current_turn = "black" if self.current_turn == "white" else "white"
-        
-        # Track position for threefold repetition
-        # Note: pawn promotion counts like a pawn move for halfmove clock (already reset in _move_piece),
-        # so position_history was already reset
-        pos_hash = self.board.get_position_hash()
-        self.position_history.append(pos_hash)
-        
-        # Keep history limited to avoid memory bloat
-        if len(self.position_history) > 200:
-            self.position_history = self.position_history[-200:]
+
+        # Complete the pawn move's record (and its position key) with the new piece
+        self.move_stack.set_promotion(new_piece.kind, self._position_key())
 
         if self._is_checkmate(self.current_turn):
             self.game_over = True
@@ -213,6 +400,103 @@ class GameLogic:
             self.game_over = True
             self.result = ("stalemate", None)  # not have a winner in stalemate
 
+    def _position_key(self) -> int:
+        """Compact key of the piece placement, for repetition detection."""
+
+        return hash(self.board.get_position_hash())
+
+    def undo(self) -> bool:
+        """Take back the last ply (a pawn move still waiting for its promotion too).
+
+        Restores the captured piece, castling rights (has_moved flags), the
+        en passant square (through last_move) and the halfmove clock from
+        the packed record; the move stays on the stack for redo().
+        Returns False if there is nothing to take back.
+        """
+
+        if not self.move_stack.can_undo():
+            return False
+
+        record = self.move_stack.undo()
+        board = self.board
+        from_row, from_col = divmod(record.from_square, 8)
+        to_row, to_col = divmod(record.to_square, 8)
+
+        piece = board.get_piece(to_row, to_col)
+        board.remove_piece(to_row, to_col)
+        if record.promotion is not None:
+            piece = Pawn(record.color)
+        board.place_piece(piece, from_row, from_col)
+        piece.has_moved = record.had_moved
+
+        if record.captured is not None:
+            enemy = "black" if record.color == "white" else "white"
+            captured = PIECE_CLASSES[record.captured](enemy)
+            captured.has_moved = record.captured_had_moved
+            # An en passant capture took the pawn beside the origin, not on the target
+            board.place_piece(captured, from_row if record.en_passant else to_row, to_col)
+
+        if record.castling:
+            rook_from_col, rook_to_col = (7, 5) if to_col > from_col else (0, 3)
+            rook = board.get_piece(to_row, rook_to_col)
+            board.remove_piece(to_row, rook_to_col)
+            board.place_piece(rook, to_row, rook_from_col)
+            # Castling is only allowed with an unmoved rook
+            rook.has_moved = False
+
+        self.current_turn = record.color
+        self.halfmove_clock = record.halfmove_clock
+        self.pending_promotion = None
+        self.game_over = False
+        self.result = None
+        self.selected_piece = None
+        self.valid_moves = []
+        self._restore_last_move()
+        self.position_version += 1
+        return True
+
+    def redo(self) -> bool:
+        """Play again the last undone ply. Returns False if there is none."""
+
+        if not self.move_stack.can_redo() or self.pending_promotion is not None:
+            return False
+
+        record = self.move_stack.next()
+        from_row, from_col = divmod(record.from_square, 8)
+        to_row, to_col = divmod(record.to_square, 8)
+
+        self.selected_piece = None
+        self.valid_moves = []
+        # Same move at the cursor: the stack keeps the rest of the redo line
+        self._move_piece(self.board.get_piece(from_row, from_col), to_row, to_col)
+        if record.promotion is not None:
+            self.promote_pawn(record.promotion)
+        return True
+
+    def go_to_ply(self, ply: int) -> None:
+        """Undo or redo until `ply` plies of the game are on the board."""
+
+        while self.move_stack.ply > ply and self.undo():
+            pass
+        while self.move_stack.ply < ply and self.redo():
+            pass
+
+    def _restore_last_move(self) -> None:
+        """Rebuild last_move and its flags from the last played record."""
+
+        previous = self.move_stack.last()
+        if previous is None:
+            self.last_move = None
+            self.last_move_was_capture = False
+            self.last_move_was_castling = False
+            return
+
+        from_row, from_col = divmod(previous.from_square, 8)
+        to_row, to_col = divmod(previous.to_square, 8)
+        self.last_move = (self.board.get_piece(to_row, to_col), from_row, from_col, to_row, to_col)
+        self.last_move_was_capture = previous.captured is not None
+        self.last_move_was_castling = previous.castling
+
     def _is_square_attacked(self, board, target_row, target_col, by_color):
         """Return True if (target_row, target_col) is attacked by any piece of by_color."""
 
@@ -364,13 +648,10 @@ class GameLogic:
         if self.halfmove_clock >= 100:
             return True
         
-        # Threefold repetition: same position appears 3 times
-        # Note: current position was already added to position_history before calling this method
-        if len(self.position_history) > 0:
-            current_pos = self.board.get_position_hash()
-            repetition_count = self.position_history.count(current_pos)  # Already includes current position
-            if repetition_count >= 3:
-                return True
+        # Threefold repetition: same position appears 3 times since the last
+        # pawn move or capture (the current position is already on the move stack)
+        if self.move_stack.repetitions(self.halfmove_clock) >= 3:
+            return True
         
         # Insufficient material: neither side can deliver checkmate
         if self._has_insufficient_material():
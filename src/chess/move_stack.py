@@ -0,0 +1,149 @@
+from array import array
+from typing import NamedTuple
+
+
+# Piece kind codes stored in a packed move (0 = no piece)
+KIND_CODES = {"pawn": 1, "knight": 2, "bishop": 3, "rook": 4, "queen": 5, "king": 6}
+KINDS = {code: kind for kind, code in KIND_CODES.items()}
+
+# Bit layout of a packed move record (one unsigned 64-bit int per ply)
+_FROM, _TO, _KIND, _CAPTURED, _PROMOTION = 0, 6, 12, 15, 18
+_CASTLING, _EN_PASSANT, _HAD_MOVED, _CAPTURED_HAD_MOVED, _BLACK = 21, 22, 23, 24, 25
+_HALFMOVE = 26
+_PROMOTION_MASK = 0b111 << _PROMOTION
+
+
+class MoveRecord(NamedTuple):
+    """Everything needed to take one ply back (see pack_move)."""
+
+    from_square: int
+    to_square: int
+    kind: str
+    color: str
+    captured: str | None
+    promotion: str | None
+    castling: bool
+    en_passant: bool
+    # has_moved of the moving / captured piece before the move (castling rights)
+    had_moved: bool
+    captured_had_moved: bool
+    # Halfmove clock (fifty-move rule) before the move
+    halfmove_clock: int
+
+
+def pack_move(record: MoveRecord) -> int:
+    """Pack a MoveRecord into 34 bits.
+
+    Squares are row * 8 + col in board coordinates (row 0 is Black's back
+    rank), like the server's move log. The captured piece's color is the
+    opposite of `color`, so only its kind is stored; the en passant square
+    and castling rights of the position before the move are recovered from
+    the previous record and the has_moved bits.
+    """
+
+    return (
+        record.from_square << _FROM
+        | record.to_square << _TO
+        | KIND_CODES[record.kind] << _KIND
+        | KIND_CODES.get(record.captured, 0) << _CAPTURED
+        | KIND_CODES.get(record.promotion, 0) << _PROMOTION
+        | record.castling << _CASTLING
+        | record.en_passant << _EN_PASSANT
+        | record.had_moved << _HAD_MOVED
+        | record.captured_had_moved << _CAPTURED_HAD_MOVED
+        | (record.color == "black") << _BLACK
+        | min(record.halfmove_clock, 0xFF) << _HALFMOVE
+    )
+
+
+def unpack_move(value: int) -> MoveRecord:
+    return MoveRecord(
+        from_square=(value >> _FROM) & 0x3F,
+        to_square=(value >> _TO) & 0x3F,
+        kind=KINDS[(value >> _KIND) & 0b111],
+        color="black" if (value >> _BLACK) & 1 else "white",
+        captured=KINDS.get((value >> _CAPTURED) & 0b111),
+        promotion=KINDS.get((value >> _PROMOTION) & 0b111),
+        castling=bool((value >> _CASTLING) & 1),
+        en_passant=bool((value >> _EN_PASSANT) & 1),
+        had_moved=bool((value >> _HAD_MOVED) & 1),
+        captured_had_moved=bool((value >> _CAPTURED_HAD_MOVED) & 1),
+        halfmove_clock=(value >> _HALFMOVE) & 0xFF,
+    )
+
+
+class MoveStack:
+    """The plies of a game as packed records, with a cursor for undo/redo.
+
+    records[:ply] have been played; records[ply:] were undone and can be
+    redone until a different move is pushed. hashes[i] identifies the
+    position after i plies (hashes[0] is the starting position) and is what
+    threefold repetition is checked against. Each ply costs 16 bytes.
+    """
+
+    def __init__(self, start_hash: int) -> None:
+        self.records = array("Q")
+        self.hashes = array("q", [start_hash])
+        self.ply = 0
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def can_undo(self) -> bool:
+        return self.ply > 0
+
+    def can_redo(self) -> bool:
+        return self.ply < len(self.records)
+
+    def push(self, value: int, position_hash: int) -> None:
+        """Record a move played at the cursor.
+
+        Playing the move that would be redone keeps the rest of the redo
+        line; any other move discards it.
+        """
+
+        if self.can_redo() and (self.records[self.ply] & ~_PROMOTION_MASK) == value:
+            self.ply += 1
+            self.hashes[self.ply] = position_hash
+            return
+
+        del self.records[self.ply :]
+        del self.hashes[self.ply + 1 :]
+        self.records.append(value)
+        self.hashes.append(position_hash)
+        self.ply += 1
+
+    def set_promotion(self, kind: str, position_hash: int) -> None:
+        """Complete the last pushed move with the piece its pawn promoted to."""
+
+        value = (self.records[self.ply - 1] & ~_PROMOTION_MASK) | KIND_CODES[kind] << _PROMOTION
+        if value != self.records[self.ply - 1] and self.can_redo():
+            # A different promotion than the undone one: that line is gone
+            del self.records[self.ply :]
+            del self.hashes[self.ply + 1 :]
+        self.records[self.ply - 1] = value
+        self.hashes[self.ply] = position_hash
+
+    def last(self) -> MoveRecord | None:
+        """The record of the last played ply."""
+
+        return unpack_move(self.records[self.ply - 1]) if self.ply else None
+
+    def undo(self) -> MoveRecord:
+        self.ply -= 1
+        return unpack_move(self.records[self.ply])
+
+    def next(self) -> MoveRecord:
+        """The record redo() would play."""
+
+        return unpack_move(self.records[self.ply])
+
+    def repetitions(self, halfmove_clock: int) -> int:
+        """How often the current position occurred since the last pawn move or capture."""
+
+        current = self.hashes[self.ply]
+        start = max(0, self.ply - halfmove_clock)
+        return self.hashes[start : self.ply + 1].count(current)
+
+    def nbytes(self) -> int:
+        return (len(self.records) + len(self.hashes)) * 8
@@ -1,11 +1,25 @@
 from abc import ABC, abstractmethod
+from collections import deque
 import copy
 import json
 import threading
-from queue import Queue
+import time
+from queue import Empty, Queue
+from urllib.parse import urlencode
+
+import pygame
 
 from src.chess.game_logic import GameLogic
-import websocket
+from src.core.latency_stats import LatencyStats
+from src.utils import settings
+
+
+# How long an online session keeps trying to resume after its connection drops
+RECONNECT_TIMEOUT = 60.0
+# Longest pause between two reconnect attempts (the delay doubles up to this)
+RECONNECT_MAX_DELAY = 5.0
+# How often an online session measures its round trip to the server (seconds)
+RTT_PROBE_INTERVAL = 2.0
 
 
 class ChessSession(ABC):
@@ -19,6 +33,11 @@ class ChessSession(ABC):
         # Chess rules engine, shared across all modes
         self.logic = GameLogic()
         self.local_color = local_color
+        # Moves queued during the opponent's turn, as (from_row, from_col, to_row, to_col);
+        # the first one is played as soon as the opponent's move is applied
+        self.premoves: list[tuple[int, int, int, int]] = []
+        # (logic, position_version) legal moves were last precomputed for
+        self._precomputed_for = None
 
     @abstractmethod
     def handle_board_click(self, row: int, col: int) -> None:
@@ -39,10 +58,120 @@ class ChessSession(ABC):
         In a pure local game, there is nothing to do here.
         """
 
+    def precompute_legal_moves(self) -> None:
+        """Compute the legal moves of the side to move on a worker thread.
+
+        Called every frame; starts once per position, when it is a local
+        player's turn, so that clicking a piece only looks its moves up.
+        The worker works on a snapshot of the board, and its result is
+        dropped if the position changed in the meantime.
+        """
+
+        logic = self.logic
+        key = (logic, logic.position_version)
+        if key == self._precomputed_for:
+            return
+        self._precomputed_for = key
+
+        if logic.game_over or logic.pending_promotion is not None:
+            return
+        if self.local_color is not None and logic.current_turn != self.local_color:
+            return
+
+        snapshot = logic.snapshot()
+        threading.Thread(
+            target=self._precompute_worker,
+            args=(logic, snapshot, logic.position_version),
+            daemon=True,
+        ).start()
+
+    @staticmethod
+    def _precompute_worker(logic, snapshot, version: int) -> None:
+        logic.store_precomputed_moves(version, snapshot.all_legal_moves())
+
+    def can_navigate(self) -> bool:
+        """Whether the players may take moves back and step through the game."""
+
+        return False
+
+    def can_premove(self) -> bool:
+        """Whether board input should queue premoves (it is the opponent's turn)."""
+
+        return (
+            self.local_color is not None
+            and not self.logic.game_over
+            and self.logic.current_turn != self.local_color
+        )
+
+    def premove_piece_at(self, row: int, col: int, queued: int | None = None):
+        """The local piece that will stand on (row, col) once the first `queued`
+        premoves (all by default) are played."""
+
+        if queued is None:
+            queued = len(self.premoves)
+
+        for index in range(queued - 1, -1, -1):
+            from_row, from_col, to_row, to_col = self.premoves[index]
+            if (to_row, to_col) == (row, col):
+                return self.premove_piece_at(from_row, from_col, index)
+            if (from_row, from_col) == (row, col):
+                # Moved away by a later premove
+                return None
+
+        piece = self.logic.board.get_piece(row, col)
+        if piece is not None and piece.color == self.local_color:
+            return piece
+        return None
+
+    def queue_premove(self, from_row: int, from_col: int, to_row: int, to_col: int) -> bool:
+        """Queue a premove. Only checks that a local piece will be on the origin
+        square; legality is checked when it is played."""
+
+        if (from_row, from_col) == (to_row, to_col):
+            return False
+        if self.premove_piece_at(from_row, from_col) is None:
+            return False
+        self.premoves.append((from_row, from_col, to_row, to_col))
+        return True
+
+    def clear_premoves(self) -> None:
+        self.premoves.clear()
+
+    def _play_premove(self) -> None:
+        """Play the first queued premove if it is now our turn.
+
+        Called right after the opponent's move was applied, in the same update,
+        so no frame (and no click) is needed. An illegal premove cancels the
+        whole queue, as the rest of it was planned around it.
+        """
+
+        if not self.premoves or self.logic.game_over:
+            return
+        if self.logic.current_turn != self.local_color or self.logic.pending_promotion:
+            return
+
+        from_row, from_col, to_row, to_col = self.premoves.pop(0)
+
+        # No time to pick a piece in a premove: promote to a queen
+        if self.play_move((from_row, from_col), (to_row, to_col), "queen") is None:
+            self.clear_premoves()
+
+    def play_move(self, from_square, to_square, promotion: str | None = None):
+        """Play a local move without going through square selection.
+
+        Returns the GameLogic.apply_move result (None if illegal).
+        """
+
+        return self.logic.apply_move(from_square, to_square, promotion)
+
 
 class LocalChessSession(ChessSession):
     """Local game session (Player vs Player on the same PC)."""
 
+    def can_navigate(self) -> bool:
+        # Both players sit at this board: takebacks need nobody's agreement
+        return True
+
     def handle_board_click(self, row: int, col: int) -> None:
         # In local mode, just delegate to GameLogic to decide selection/move
         self.logic.select_square(row, col)
@@ -53,38 +182,123 @@ class LocalChessSession(ChessSession):
 
 
 class OnlineChessSession(ChessSession):
-    def __init__(self, server_url: str) -> None:
+    def __init__(
+        self,
+        server_url: str,
+        rating: int | None = None,
+        time_control: tuple[float, float] | None = None,
+    ) -> None:
         super().__init__(local_color=None)
 
-        self.server_url = server_url
+        # Reconnects use the bare URL with ?resume=&last_seq= instead of matchmaking params
+        self._base_url = server_url
+
+        # Matchmaking preferences travel in the query string (?rating=&base=&increment=)
+        params = {}
+        if rating is not None:
+            params["rating"] = rating
+        if time_control is not None:
+            params["base"], params["increment"] = time_control
+        self.server_url = f"{server_url}?{urlencode(params)}" if params else server_url
 
         self.connection_status: str = (
-            "connecting"  # connecting | waiting_for_opponent | matched | error
+            "connecting"  # connecting | waiting_for_opponent | matched | reconnecting | error | closed
         )
         self.room_id: str | None = None
         self.assigned_color: str | None = None  # "white" or "black"
 
+        # Last clock state from the server: {"white": ms, "black": ms, "turn", "running"}
+        self.clock: dict | None = None
+        # Local monotonic time when `clock` was received (to keep counting down between updates)
+        self._clock_received_at = 0.0
+        # Whether the end of the game was already reported to the server (for its archive)
+        self._result_reported = False
+
+        # Resume state: token from match_found and the last sequenced message seen
+        self.resume_token: str | None = None
+        self.last_seq = 0
+        # Moves/promotions sent but not yet acknowledged (resent after a resume if lost)
+        self._unacked: deque[dict] = deque()
+        # Sequenced messages still expected in the delta that follows "resumed"
+        self._resume_remaining = 0
+        self.opponent_connected = True
+        # Set when the room is gone for good (quit, opponent left, resume refused)
+        self._leaving = False
+        self._room_closed = False
+
+        # Rolling latency measurements (RTT, server relay, client apply/render)
+        self.latency = LatencyStats()
+        self._last_probe_at = 0.0
+        # When the last opponent move was applied, until the next frame is rendered
+        self._applied_at: float | None = None
+
         # Queue of messages received from the server (consumed by GameState/session)
         self._inbound_messages: Queue[dict] = Queue()
 
         # WebSocketApp from websocket-client library
-        self._ws_app = websocket.WebSocketApp(
-            self.server_url,
+        self._ws_app = self._create_app(self.server_url)
+
+        # Run the websocket in a separate thread so it does not block the pygame loop
+        self._ws_thread = threading.Thread(target=self._run, daemon=True)
+        self._ws_thread.start()
+
+    def _create_app(self, url: str) -> "websocket.WebSocketApp":
+        # Imported here so local and AI games never load the networking stack
+        import websocket
+
+        return websocket.WebSocketApp(
+            url,
             on_open=self._on_open,
             on_message=self._on_message,
             on_error=self._on_error,
             on_close=self._on_close,
         )
 
-        # Run the websocket in a separate thread so it does not block the pygame loop
-        self._ws_thread = threading.Thread(
-            target=self._ws_app.run_forever,
-            daemon=True,
+    def _should_resume(self) -> bool:
+        return (
+            self.resume_token is not None
+            and not self._leaving
+            and not self._room_closed
         )
-        self._ws_thread.start()
+
+    def _run(self) -> None:
+        """Network thread: run the socket and, if it drops mid-game, resume it."""
+
+        deadline = None
+        delay = 0.5
+
+        while True:
+            self._ws_app.run_forever()
+
+            if not self._should_resume():
+                break
+
+            if self.connection_status == "matched" or deadline is None:
+                # Fresh drop (or a resume that got through and dropped again)
+                deadline = time.monotonic() + RECONNECT_TIMEOUT
+                delay = 0.5
+            self.connection_status = "reconnecting"
+
+            if time.monotonic() + delay > deadline:
+                self.connection_status = "closed"
+                break
+
+            time.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+            params = urlencode({"resume": self.resume_token, "last_seq": self.last_seq})
+            self._ws_app = self._create_app(f"{self._base_url}?{params}")
 
     def close(self) -> None:
-        """Close the websocket connection and mark the session as closed."""
+        """Leave the game, close the websocket connection and mark the session as closed."""
+
+        self._leaving = True
+
+        try:
+            # Tell the server this is a deliberate quit, not a network drop
+            self._ws_app.send(json.dumps({"type": "leave"}))
+        except Exception:
+            pass
 
         try:
             self._ws_app.close()
@@ -95,46 +309,173 @@ class OnlineChessSession(ChessSession):
             self.connection_status = "closed"
 
     def _on_open(self, ws) -> None:
-        self.connection_status = "connected"
+        # While resuming, stay "reconnecting" until the server confirms with "resumed"
+        if self.connection_status != "reconnecting":
+            self.connection_status = "connected"
 
     def _on_message(self, ws, message: str) -> None:
         """
+        - {"type": "ping"} (server heartbeat, answered immediately)
+        - {"type": "pong", "t": float} (answer to our RTT probe, echoing its send time)
         - {"type": "waiting_for_opponent"}
-        - {"type": "match_found", "room_id": str, "color": "white"|"black"}
+        - {"type": "match_found", "room_id": str, "color": "white"|"black", "clock": {...},
+           "resume_token": str}
         - {"type": "opponent_left"}
-        - {"type": "move", "from": [row, col], "to": [row, col], "promotion": "queen"|"rook"|...}
+        - {"type": "opponent_disconnected"} / {"type": "opponent_reconnected"}
+        - {"type": "move", "from": [row, col], "to": [row, col], "color": str, "seq": int,
+           "clock": {...}, "relay_ms": float}
+        - {"type": "promotion", "piece": "queen"|"rook"|..., "color": str, "seq": int}
+        - {"type": "ack", "seq": int, "clock": {...}, "t": float} (for a move/promotion we sent)
+        - {"type": "flag", "loser": color, "winner": color, "clock": {...}, "seq": int}
+        - {"type": "resumed", "last_seq": int, ...} then the missed sequenced messages
+        - {"type": "resume_failed"}
         """
 
+        received_at = time.perf_counter()
+
         try:
             data = json.loads(message)
         except json.JSONDecodeError:
             # Ignore invalid messages
             return
 
+        if data["type"] == "pong":
+            sent_at = data.get("t")
+            if isinstance(sent_at, (int, float)):
+                self.latency.rtt.add((received_at - sent_at) * 1000)
+            return
+
+        if data["type"] == "ping":
+            # Answer from the network thread so heartbeats do not depend on the frame rate
+            try:
+                ws.send(json.dumps({"type": "pong"}))
+            except Exception:
+                pass
+            return
+
+        if "seq" in data and not self._track_seq(data):
+            # Already seen (duplicate delivery around a resume)
+            return
+
+        if data["type"] == "ack" and isinstance(data.get("t"), (int, float)):
+            self.latency.move_ack.add((received_at - data["t"]) * 1000)
+        elif data["type"] in ("move", "promotion"):
+            # Lets the game loop measure how long the message waited to be applied
+            data["received_at"] = received_at
+
         if data["type"] == "waiting_for_opponent":
             self.connection_status = "waiting_for_opponent"
         elif data["type"] == "match_found":
             self.connection_status = "matched"
             self.room_id = data["room_id"]
             self.assigned_color = data["color"]
+            self.resume_token = data.get("resume_token")
 
             # We now know the local player's color
             self.local_color = self.assigned_color
+        elif data["type"] == "resumed":
+            self.connection_status = "matched"
+            self._resume_remaining = data["last_seq"] - self.last_seq
+            if self._resume_remaining <= 0:
+                self._resend_unacked()
+        elif data["type"] == "opponent_disconnected":
+            self.opponent_connected = False
+        elif data["type"] == "opponent_reconnected":
+            self.opponent_connected = True
+        elif data["type"] in ("opponent_left", "resume_failed"):
+            self._room_closed = True
+            if data["type"] == "resume_failed":
+                self.connection_status = "closed"
 
         # Store every message for later consumption by GameState/logic
         self._inbound_messages.put(data)
+        self._wake_main_loop()
+
+    def _wake_main_loop(self) -> None:
+        """Post a pygame event so the main loop handles the new message now."""
+
+        try:
+            # SDL's event queue is thread-safe; this may be called from the network thread
+            pygame.event.post(pygame.event.Event(settings.NETWORK_MESSAGE_EVENT))
+        except pygame.error:
+            # Display not initialized (or shutting down): update() will still poll the queue
+            pass
 
     def _on_error(self, ws, error) -> None:
-        self.connection_status = "error"
+        # Mid-game errors are handled by the resume loop in _run
+        if not self._should_resume():
+            self.connection_status = "error"
 
     def _on_close(self, ws, close_status_code, close_msg) -> None:
+        if self._should_resume():
+            return
         if self.connection_status != "error":
             self.connection_status = "closed"
 
+    def _track_seq(self, data: dict) -> bool:
+        """Record a sequenced message. Returns False if it was already seen."""
+
+        seq = data["seq"]
+        if seq <= self.last_seq:
+            return False
+        self.last_seq = seq
+
+        # Our own message came back: as an ack, or echoed in a resume delta
+        if data["type"] == "ack" or data.get("color") == self.local_color:
+            if self._unacked:
+                self._unacked.popleft()
+
+        if self._resume_remaining > 0:
+            self._resume_remaining -= 1
+            if self._resume_remaining == 0:
+                self._resend_unacked()
+        return True
+
+    def _resend_unacked(self) -> None:
+        """After a resume, send again what the server never received."""
+
+        for payload in self._unacked:
+            payload["t"] = time.perf_counter()
+            try:
+                self._ws_app.send(json.dumps(payload))
+            except Exception:
+                return
+
+    def _send_game_message(self, payload: dict) -> None:
+        """Send a move/promotion, remembering it until the server acknowledges it."""
+
+        # Send time (our perf_counter), echoed back in the ack
+        payload["t"] = time.perf_counter()
+        self._unacked.append(payload)
+        try:
+            # websocket-client sends text; the FastAPI server expects JSON
+            self._ws_app.send(json.dumps(payload))
+        except Exception:
+            # The resume loop reconnects and resends unacknowledged messages
+            pass
+
+    def _set_clock(self, clock: dict | None) -> None:
+        if clock is None:
+            return
+        self.clock = clock
+        self._clock_received_at = time.monotonic()
+
+    def clock_remaining(self, color: str) -> float | None:
+        """Seconds left on `color`'s clock, or None if the game is untimed."""
+
+        if self.clock is None:
+            return None
+
+        remaining = self.clock[color] / 1000
+        if self.clock["running"] and self.clock["turn"] == color:
+            remaining -= time.monotonic() - self._clock_received_at
+        return max(0.0, remaining)
+
     def get_next_message(self) -> dict | None:
-        if self._inbound_messages.empty():
+        try:
+            return self._inbound_messages.get_nowait()
+        except Empty:
             return None
-        return self._inbound_messages.get()
 
     def promote_pawn(self, new_piece_kind: str) -> None:
         """Promotion initiated by the local player.
@@ -156,15 +497,13 @@ class OnlineChessSession(ChessSession):
         self.logic.promote_pawn(new_piece_kind)
 
         # Notify the opponent
-        if self.connection_status == "matched":
-            payload = {
-                "type": "promotion",
-                "piece": new_piece_kind,
-            }
-            try:
-                self._ws_app.send(json.dumps(payload))
-            except Exception:
-                self.connection_status = "error"
+        if self.connection_status in ("matched", "reconnecting"):
+            self._send_game_message(
+                {
+                    "type": "promotion",
+                    "piece": new_piece_kind,
+                }
+            )
 
     def _send_move(
         self, from_row: int, from_col: int, to_row: int, to_col: int
@@ -177,18 +516,31 @@ class OnlineChessSession(ChessSession):
         if self.connection_status != "matched":
             return
 
-        payload = {
-            "type": "move",
-            "from": [from_row, from_col],
-            "to": [to_row, to_col],
-        }
+        self._send_game_message(
+            {
+                "type": "move",
+                "from": [from_row, from_col],
+                "to": [to_row, to_col],
+            }
+        )
 
-        try:
-            # websocket-client sends text; the FastAPI server expects JSON
-            self._ws_app.send(json.dumps(payload))
-        except Exception:
-            # On send error, mark the connection as broken
-            self.connection_status = "error"
+    def can_premove(self) -> bool:
+        return self.connection_status == "matched" and super().can_premove()
+
+    def play_move(self, from_square, to_square, promotion: str | None = None):
+        """Play a local move directly and send it (and its promotion) to the server."""
+
+        if self.connection_status != "matched" or self.logic.current_turn != self.local_color:
+            return None
+
+        result = self.logic.apply_move(from_square, to_square)
+        if result is None:
+            return None
+
+        self._send_move(*from_square, *to_square)
+        if self.logic.pending_promotion is not None and promotion is not None:
+            self.promote_pawn(promotion)
+        return result
 
     def handle_board_click(self, row: int, col: int) -> None:
         """Handle board clicks in online mode.
@@ -227,7 +579,52 @@ class OnlineChessSession(ChessSession):
     def update(self, dt: float) -> None:
         """Process messages received from the server (opponent moves, etc.)."""
 
-        # Consume all pending messages in this frame
+        # Normally already drained on NETWORK_MESSAGE_EVENT; this catches anything
+        # that arrived while no state was listening for the event
+        self.process_messages()
+
+        if self.logic.game_over and not self._result_reported:
+            self._report_result()
+
+        self._probe_rtt()
+
+    def _probe_rtt(self) -> None:
+        """Every RTT_PROBE_INTERVAL, ping the server; the pong carries our send time back."""
+
+        now = time.perf_counter()
+        if now - self._last_probe_at < RTT_PROBE_INTERVAL:
+            return
+        if self.connection_status not in ("matched", "waiting_for_opponent"):
+            return
+
+        self._last_probe_at = now
+        try:
+            self._ws_app.send(json.dumps({"type": "ping", "t": now}))
+        except Exception:
+            # A broken connection is handled by the network thread
+            pass
+
+    def _record_applied(self, msg: dict) -> None:
+        """Account for an opponent move that was just applied to the board."""
+
+        now = time.perf_counter()
+        received_at = msg.get("received_at")
+        if received_at is not None:
+            self.latency.receive_to_apply.add((now - received_at) * 1000)
+        if isinstance(msg.get("relay_ms"), (int, float)):
+            self.latency.server_relay.add(msg["relay_ms"])
+        self._applied_at = now
+
+    def note_rendered(self) -> None:
+        """Called by GameState once a frame showing the latest moves was drawn."""
+
+        if self._applied_at is not None:
+            self.latency.apply_to_render.add((time.perf_counter() - self._applied_at) * 1000)
+            self._applied_at = None
+
+    def process_messages(self) -> None:
+        """Apply every message received so far (called as soon as one arrives)."""
+
         while True:
             msg = self.get_next_message()
             if msg is None:
@@ -235,6 +632,13 @@ class OnlineChessSession(ChessSession):
 
             msg_type = msg.get("type")
 
+            # Every clock-bearing message refreshes the displayed clocks
+            self._set_clock(msg.get("clock"))
+
+            # Our own moves echoed back by a resume were already applied locally
+            if msg_type in ("move", "promotion") and msg.get("color") == self.local_color:
+                continue
+
             if msg_type == "move":
                 # Opponent's move
                 from_row, from_col = msg.get("from", [None, None])
@@ -246,21 +650,46 @@ class OnlineChessSession(ChessSession):
                 if self.logic.game_over:
                     continue
 
-                # Apply the remote move using the same GameLogic flow
-                self.logic.select_square(from_row, from_col)
-                self.logic.select_square(to_row, to_col)
+                # Apply the remote move (its promotion, if any, follows in its own message)
+                self.logic.apply_move((from_row, from_col), (to_row, to_col))
+                self._record_applied(msg)
+
+                # Answer with a queued premove in this same update
+                self._play_premove()
 
             elif msg_type == "promotion":
                 # Promotion choice made by the opponent
                 piece = msg.get("piece")
                 if piece and self.logic.pending_promotion is not None:
                     self.logic.promote_pawn(piece)
+                self._play_premove()
+
+            elif msg_type == "flag":
+                # The server's clock is authoritative: the game is lost on time
+                if not self.logic.game_over:
+                    self.logic.game_over = True
+                    self.logic.result = ("timeout", msg.get("winner"))
 
             elif msg_type == "opponent_left":
                 # We could mark game_over or notify GameState here
                 # For now we just update the connection status
                 self.connection_status = "closed"
 
+    def _report_result(self) -> None:
+        """Tell the server how the game ended so it can archive the result."""
+
+        if self.connection_status != "matched" or self.logic.result is None:
+            return
+
+        reason, winner = self.logic.result
+        try:
+            self._ws_app.send(
+                json.dumps({"type": "game_over", "reason": reason, "winner": winner})
+            )
+        except Exception:
+            self.connection_status = "error"
+        self._result_reported = True
+
 
 class AiChessSession(ChessSession):
     def __init__(self, local_color, elo=1900):
@@ -283,6 +712,12 @@ class AiChessSession(ChessSession):
         move = self.ai.get_move(board_copy, self.ai_color)
         self.queue.put(move)
 
+        try:
+            # Wake the game loop so the move is played without waiting for an idle frame
+            pygame.event.post(pygame.event.Event(settings.AI_MOVE_EVENT))
+        except pygame.error:
+            pass
+
     def handle_board_click(self, row, col):
         """Handle human input only when it's the human's turn."""
 
@@ -317,14 +752,10 @@ class AiChessSession(ChessSession):
             if move is None:
                 return
 
-            (from_row, from_col), (to_row, to_col) = move
+            (from_row, from_col), (to_row, to_col), promotion = move
 
-            # Apply the move using the existing selection/move logic
-            self.logic.select_square(from_row, from_col)
-            self.logic.select_square(to_row, to_col)
+            # A promoting move carries the engine's own choice of piece
+            self.logic.apply_move((from_row, from_col), (to_row, to_col), promotion or "queen")
 
-            # If AI's move created a pending promotion, auto-promote to queen
-            if self.logic.pending_promotion is not None:
-                self.logic.promote_pawn(
-                    "queen"
-                )  # TODO: adapt to AI to do your own promotion
+            # Answer with a queued premove in this same update
+            self._play_premove()
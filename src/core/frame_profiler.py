@@ -0,0 +1,181 @@
+from collections import deque
+import cProfile
+import functools
+import pstats
+import time
+
+import pygame
+
+from src.chess.board import Board
+from src.chess.game_logic import GameLogic
+from src.utils import settings
+from src.utils.asset_manager import assets
+
+
+# Hot rules-engine methods whose calls are counted per frame: (label, class, method)
+HOT_METHODS = (
+    ("board clones", Board, "clone"),
+    ("attack checks", GameLogic, "_is_square_attacked"),
+    ("legal move generations", GameLogic, "_compute_legal_moves"),
+    ("legal move filters", GameLogic, "_get_legal_moves_for_moves"),
+    ("king safety checks", GameLogic, "_move_leaves_king_in_check"),
+)
+# Parts of a frame timed separately, in drawing order (bottom to top of a graph bar)
+SECTIONS = ("events", "update", "render")
+SECTION_COLORS = {
+    "events": (90, 160, 230),
+    "update": (230, 180, 60),
+    "render": (110, 200, 110),
+}
+
+# Frames kept for the overlay graph and averages
+PROFILER_WINDOW = 120
+GRAPH_HEIGHT = 80
+# Frame time drawn at the top of the graph, and the 60 FPS budget line (ms)
+GRAPH_MAX_MS = 33.3
+BUDGET_MS = 1000 / 60
+
+
+class FrameProfiler:
+    """Opt-in instrumentation of the game loop (settings.FRAME_PROFILER).
+
+    Times StateManager.handle_event / update / render per frame, counts
+    calls to the HOT_METHODS of the rules engine, draws an overlay with a
+    frame time graph (F4) and records a cProfile of the next
+    FRAME_PROFILE_FRAMES frames on demand (F5).
+
+    Nothing is wrapped unless a profiler is created and attached, so the
+    disabled game loop runs exactly the uninstrumented code.
+    """
+
+    def __init__(self) -> None:
+        self.frames: deque[dict[str, float]] = deque(maxlen=PROFILER_WINDOW)
+        self.counts: deque[dict[str, int]] = deque(maxlen=PROFILER_WINDOW)
+        self._current = dict.fromkeys(SECTIONS, 0.0)
+        self._calls = {label: 0 for label, _, _ in HOT_METHODS}
+        self.show_overlay = True
+        self._profile: cProfile.Profile | None = None
+        self._profile_frames = 0
+        self._profile_frames_left = 0
+        self._count_hot_methods()
+
+    def _count_hot_methods(self) -> None:
+        for label, cls, name in HOT_METHODS:
+            method = getattr(cls, name)
+
+            @functools.wraps(method)
+            def counted(*args, _method=method, _label=label, **kwargs):
+                self._calls[_label] += 1
+                return _method(*args, **kwargs)
+
+            setattr(cls, name, counted)
+
+    def attach(self, state_manager) -> None:
+        """Time the state manager's handle_event / update / render calls."""
+
+        for section, name in zip(SECTIONS, ("handle_event", "update", "render")):
+            method = getattr(state_manager, name)
+
+            @functools.wraps(method)
+            def timed(*args, _method=method, _section=section, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return _method(*args, **kwargs)
+                finally:
+                    self._current[_section] += (time.perf_counter() - start) * 1000
+
+            setattr(state_manager, name, timed)
+
+    def handle_event(self, event) -> None:
+        if event.type != pygame.KEYDOWN:
+            return
+        if event.key == pygame.K_F4:
+            self.show_overlay = not self.show_overlay
+        elif event.key == pygame.K_F5:
+            self.start_capture()
+
+    def end_frame(self) -> None:
+        """Close the current frame; events handled from now on count toward the next one."""
+
+        self.frames.append(self._current)
+        self.counts.append(self._calls)
+        self._current = dict.fromkeys(SECTIONS, 0.0)
+        self._calls = dict.fromkeys(self._calls, 0)
+
+        if self._profile is not None:
+            self._profile_frames_left -= 1
+            if self._profile_frames_left <= 0:
+                self._finish_capture()
+
+    def start_capture(self, frames: int | None = None) -> None:
+        """Run cProfile over the next `frames` frames (main thread only)."""
+
+        if self._profile is not None:
+            return
+        self._profile = cProfile.Profile()
+        self._profile_frames = self._profile_frames_left = frames or settings.FRAME_PROFILE_FRAMES
+        self._profile.enable()
+
+    def _finish_capture(self) -> None:
+        self._profile.disable()
+        settings.PROFILES_PATH.mkdir(parents=True, exist_ok=True)
+        path = settings.PROFILES_PATH / time.strftime("frames-%Y%m%d-%H%M%S.prof")
+        self._profile.dump_stats(path)
+
+        print(f"profile of {self._profile_frames} frames written to {path}")
+        pstats.Stats(self._profile).sort_stats("cumulative").print_stats(15)
+        self._profile = None
+
+    def summary(self) -> tuple[dict[str, float], dict[str, float]]:
+        """Mean ms per section and mean calls per hot method over the window."""
+
+        frames = len(self.frames) or 1
+        sections = {
+            section: sum(frame[section] for frame in self.frames) / frames for section in SECTIONS
+        }
+        calls = {label: sum(c[label] for c in self.counts) / frames for label in self._calls}
+        return sections, calls
+
+    def render(self, screen: pygame.Surface) -> None:
+        """Overlay: a bar per recent frame (stacked by section) and the window averages."""
+
+        if not self.show_overlay:
+            return
+
+        width = PROFILER_WINDOW * 2
+        # Numbers change every frame: rendered directly, not through the asset text cache
+        font = assets.font(18)
+        sections, calls = self.summary()
+        lines = [
+            "  ".join(f"{section} {ms:.2f}" for section, ms in sections.items()) + " ms",
+            *(f"{label}: {count:.1f}/frame" for label, count in calls.items()),
+        ]
+        if self._profile is not None:
+            lines.append(f"profiling... {self._profile_frames_left} frames left")
+
+        line_height = font.get_linesize()
+        panel = pygame.Rect(0, 0, width + 8, GRAPH_HEIGHT + 8 + line_height * len(lines))
+        panel.topright = (screen.get_width() - 4, 4)
+        screen.fill((20, 20, 20), panel)
+
+        graph_bottom = panel.y + 4 + GRAPH_HEIGHT
+        scale = GRAPH_HEIGHT / GRAPH_MAX_MS
+        for index, frame in enumerate(self.frames):
+            x = panel.x + 4 + index * 2
+            y = graph_bottom
+            graph_top = graph_bottom - GRAPH_HEIGHT
+            for section in SECTIONS:
+                # Clip the bar at the top of the graph
+                height = min(int(frame[section] * scale + 0.5), y - graph_top)
+                if height > 0:
+                    y -= height
+                    screen.fill(SECTION_COLORS[section], (x, y, 2, height))
+        budget_y = graph_bottom - int(BUDGET_MS * scale)
+        pygame.draw.line(
+            screen, (200, 60, 60), (panel.x + 4, budget_y), (panel.right - 4, budget_y)
+        )
+
+        y = graph_bottom + 4
+        for line in lines:
+            screen.blit(font.render(line, True, (240, 217, 181)), (panel.x + 4, y))
+            y += line_height
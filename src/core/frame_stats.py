@@ -0,0 +1,59 @@
+import time
+
+
+class FrameStats:
+    """Frame time and CPU use of the game loop, split by scheduling mode.
+
+    For each mode ("active" at full FPS, "idle" at the reduced rate) it
+    accumulates the wall time spent in that mode, the process CPU time used
+    meanwhile and the time spent producing frames (update + render).
+    """
+
+    MODES = ("active", "idle")
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.frames = {mode: 0 for mode in self.MODES}
+        self.frame_time = {mode: 0.0 for mode in self.MODES}
+        self.wall_time = {mode: 0.0 for mode in self.MODES}
+        self.cpu_time = {mode: 0.0 for mode in self.MODES}
+        self.started_at = time.perf_counter()
+        self._last_wall = self.started_at
+        self._last_cpu = time.process_time()
+
+    def record_frame(self, mode: str, frame_seconds: float) -> None:
+        """Account one frame, and the time since the previous one, to `mode`."""
+
+        wall = time.perf_counter()
+        cpu = time.process_time()
+
+        self.frames[mode] += 1
+        self.frame_time[mode] += frame_seconds
+        self.wall_time[mode] += wall - self._last_wall
+        self.cpu_time[mode] += cpu - self._last_cpu
+
+        self._last_wall = wall
+        self._last_cpu = cpu
+
+    def summary(self) -> dict:
+        """{mode: (frames, average frame ms, frames per second, CPU percent)}."""
+
+        summary = {}
+        for mode in self.MODES:
+            frames = self.frames[mode]
+            wall = self.wall_time[mode]
+            summary[mode] = (
+                frames,
+                self.frame_time[mode] / frames * 1000 if frames else 0.0,
+                frames / wall if wall else 0.0,
+                self.cpu_time[mode] / wall * 100 if wall else 0.0,
+            )
+        return summary
+
+    def format(self) -> str:
+        return " | ".join(
+            f"{mode}: {frames} frames, {frame_ms:.2f} ms/frame, {fps:.1f} fps, {cpu:.1f}% CPU"
+            for mode, (frames, frame_ms, fps, cpu) in self.summary().items()
+        )
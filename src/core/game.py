@@ -1,34 +1,133 @@
+import time
+
 import pygame
 
+from src.core.frame_stats import FrameStats
 from src.core.state_manager import StateManager
 
 from src.states.home_state import HomeState
 from src.utils import settings
+from src.utils.asset_manager import assets
+from src.utils.startup_profile import startup_profile
 
 
 class GameApp:
     def __init__(self):
         pygame.init()
+        startup_profile.mark("pygame.init")
         settings.initialize_display_settings()
 
         self.screen = pygame.display.set_mode((settings.WIDTH, settings.HEIGHT))
+        startup_profile.mark("display init")
         self.clock = pygame.time.Clock()
         self.running = True
+        # Set when the window needs repainting regardless of what states report
+        self._full_redraw = True
+        # Start time (ms ticks) of the last frame, for scheduling the next one
+        self._last_frame = 0
+        self.frame_stats = FrameStats()
 
         self.state_manager = StateManager()
+        # Only built when enabled: otherwise the loop runs without any instrumentation
+        self.profiler = None
+        if settings.FRAME_PROFILER:
+            from src.core.frame_profiler import FrameProfiler
+
+            self.profiler = FrameProfiler()
+            self.profiler.attach(self.state_manager)
         self.state_manager.change_state(HomeState(self.state_manager))
+        startup_profile.mark("home state")
 
     def run(self):
+        active_interval = 1000 / settings.FPS
+        idle_interval = 1000 / settings.IDLE_FPS
+        next_frame = pygame.time.get_ticks()
+        stats_logged_at = time.perf_counter()
+
         while self.running:
-            dt = self.clock.tick(settings.FPS) / 1000  # delta time in seconds
+            # Sleep in pygame.event.wait() until the next frame is due. Input,
+            # network messages and AI moves wake it up and are handled right away;
+            # they also bring the next frame forward to the full frame rate.
+            timeout = int(next_frame - pygame.time.get_ticks())
+            if timeout > 0:
+                event = pygame.event.wait(timeout)
+                if event.type != pygame.NOEVENT:
+                    self._handle_event(event)
+                    next_frame = min(next_frame, self._last_frame + active_interval)
+                continue
 
             for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
-                self.state_manager.handle_event(event)
+                self._handle_event(event)
+
+            self._last_frame = pygame.time.get_ticks()
+            frame_started = time.perf_counter()
+            dt = self.clock.tick() / 1000  # delta time in seconds
 
             self.state_manager.update(dt)
+            self._render_frame()
+            startup_profile.menu_ready(settings.STARTUP_BUDGET_MS)
+
+            # Full FPS only while something moves on screen (drag, modal);
+            # otherwise tick at IDLE_FPS until an event arrives
+            active = self.state_manager.is_active()
+            next_frame = self._last_frame + (active_interval if active else idle_interval)
+
+            self.frame_stats.record_frame(
+                "active" if active else "idle", time.perf_counter() - frame_started
+            )
+            if self.profiler is not None:
+                self.profiler.end_frame()
+            if settings.LOG_FRAME_STATS and time.perf_counter() - stats_logged_at >= 10:
+                print(self.frame_stats.format())
+                print(assets.report())
+                stats_logged_at = time.perf_counter()
+
+        if settings.LOG_FRAME_STATS:
+            print(self.frame_stats.format())
+            print(assets.report())
+        pygame.quit()
+
+    def _render_frame(self):
+        rects = self.state_manager.dirty_rects()
+        if self._full_redraw or not settings.DIRTY_RECT_RENDERING:
+            rects = None
+        self._full_redraw = False
+
+        if self.profiler is not None and self.profiler.show_overlay:
+            # The graph changes every frame; repaint everything under it
+            rects = None
+
+        if rects is None:
             self.screen.fill(settings.BACKGROUND_COLOR_RGB)
             self.state_manager.render(self.screen)
+            if self.profiler is not None:
+                self.profiler.render(self.screen)
             pygame.display.flip()
-        pygame.quit()
+            return
+
+        if not rects:
+            # Nothing changed: skip drawing and presenting entirely
+            return
+
+        # Render once into the back buffer, clipped to the area spanning the
+        # changed rects (clipping only saves pixel writes, so one pass is
+        # cheaper than one per rect), then present only the changed rects
+        self.screen.set_clip(rects[0].unionall(rects[1:]))
+        self.screen.fill(settings.BACKGROUND_COLOR_RGB)
+        self.state_manager.render(self.screen)
+        self.screen.set_clip(None)
+        pygame.display.update(rects)
+
+    def _handle_event(self, event):
+        if event.type == pygame.QUIT:
+            self.running = False
+        elif event.type in (pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+            # The window contents may have been lost
+            self._full_redraw = True
+        if self.profiler is not None:
+            shown = self.profiler.show_overlay
+            self.profiler.handle_event(event)
+            if self.profiler.show_overlay != shown:
+                # Hiding the overlay must erase it
+                self._full_redraw = True
+        self.state_manager.handle_event(event)
@@ -0,0 +1,64 @@
+from collections import deque
+
+
+# Samples kept per measurement; older ones roll out of the window
+LATENCY_WINDOW = 50
+
+
+class RollingStat:
+    """The last `window` samples of one measurement (milliseconds)."""
+
+    def __init__(self, window: int = LATENCY_WINDOW) -> None:
+        self.samples: deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def add(self, value_ms: float) -> None:
+        self.samples.append(value_ms)
+
+    @property
+    def last(self) -> float | None:
+        return self.samples[-1] if self.samples else None
+
+    @property
+    def mean(self) -> float | None:
+        if not self.samples:
+            return None
+        return sum(self.samples) / len(self.samples)
+
+    @property
+    def p95(self) -> float | None:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+class LatencyStats:
+    """Where the time of an online move goes, split by hop.
+
+    - rtt: ping -> pong round trip to the server
+    - move_ack: our move sent -> server ack received
+    - server_relay: opponent move received by the server -> relayed (server side)
+    - receive_to_apply: message received by the network thread -> applied by the game loop
+    - apply_to_render: opponent move applied -> next frame rendered
+    """
+
+    NAMES = ("rtt", "move_ack", "server_relay", "receive_to_apply", "apply_to_render")
+
+    def __init__(self, window: int = LATENCY_WINDOW) -> None:
+        self.rtt = RollingStat(window)
+        self.move_ack = RollingStat(window)
+        self.server_relay = RollingStat(window)
+        self.receive_to_apply = RollingStat(window)
+        self.apply_to_render = RollingStat(window)
+
+    def summary(self) -> dict:
+        """{name: (last, mean, p95)} in milliseconds, None where there is no sample yet."""
+
+        summary = {}
+        for name in self.NAMES:
+            stat = getattr(self, name)
+            summary[name] = (stat.last, stat.mean, stat.p95)
+        return summary
@@ -17,3 +17,19 @@ class State(ABC):
     @abstractmethod
     def render(self, surface):
         pass
+
+    def dirty_rects(self):
+        """Screen regions changed since the last rendered frame.
+
+        Called after update(). Returning None asks for a full redraw; an empty
+        list means nothing needs to be drawn this frame.
+        """
+
+        return None
+
+    def is_active(self):
+        """Whether the state needs the full frame rate right now (something is
+        moving on screen). Otherwise the game loop drops to settings.IDLE_FPS
+        and waits for events."""
+
+        return False
@@ -1,6 +1,8 @@
 class StateManager:
     def __init__(self):
         self.current_state = None
+        # A new state always starts with a full redraw
+        self._state_changed = False
 
     def change_state(self, new_state):
         if self.current_state:
@@ -8,6 +10,7 @@ class StateManager:
 
         self.current_state = new_state
         self.current_state.enter()
+        self._state_changed = True
 
     def handle_event(self, event):
         if self.current_state:
@@ -17,6 +20,18 @@ class StateManager:
         if self.current_state:
             self.current_state.update(dt)
 
+    def dirty_rects(self):
+        if self.current_state is None or self._state_changed:
+            self._state_changed = False
+            if self.current_state is not None:
+                # Let the new state record what it is about to draw
+                self.current_state.dirty_rects()
+            return None
+        return self.current_state.dirty_rects()
+
+    def is_active(self):
+        return self.current_state is not None and self.current_state.is_active()
+
     def render(self, surface):
         if self.current_state:
             self.current_state.render(surface)
@@ -1,4 +1,13 @@
+# Imported first so its clock starts with the process (see CHESS_PROFILE_STARTUP)
+from src.utils.startup_profile import startup_profile
+
+import pygame
+
+startup_profile.mark("import pygame")
+
 from src.core.game import GameApp
 
+startup_profile.mark("import client modules")
+
 if __name__ == "__main__":
     GameApp().run()
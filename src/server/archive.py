@@ -0,0 +1,178 @@
+from pathlib import Path
+import queue
+import sqlite3
+import threading
+import time
+from typing import List, NamedTuple
+
+from src.server import metrics
+
+
+# Most games written in a single transaction
+ARCHIVE_BATCH_SIZE = 500
+# Longest a finished game waits in memory before its batch is committed (seconds)
+ARCHIVE_FLUSH_INTERVAL = 1.0
+# Finished games allowed to wait for the writer; beyond this new games are dropped
+ARCHIVE_QUEUE_MAX = 100_000
+# Longest shutdown waits for the writer to take the stop signal, then to finish (seconds)
+ARCHIVE_STOP_TIMEOUT = 10.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    room_id TEXT PRIMARY KEY,
+    white TEXT NOT NULL,
+    black TEXT NOT NULL,
+    white_rating INTEGER NOT NULL,
+    black_rating INTEGER NOT NULL,
+    base REAL,
+    increment REAL,
+    started_at REAL NOT NULL,
+    ended_at REAL NOT NULL,
+    result TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    moves BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_white ON games (white, ended_at);
+CREATE INDEX IF NOT EXISTS games_black ON games (black, ended_at);
+CREATE INDEX IF NOT EXISTS games_ended_at ON games (ended_at);
+CREATE INDEX IF NOT EXISTS games_result ON games (result, ended_at);
+"""
+
+archived_games = metrics.registry.counter(
+    "chess_archived_games_total", "Finished games committed to the archive."
+)
+dropped_games = metrics.registry.counter(
+    "chess_archive_dropped_games_total",
+    "Finished games discarded because the archive queue was full.",
+)
+
+
+class GameRecord(NamedTuple):
+    """One finished game, in column order of the `games` table.
+
+    `moves` is the packed move log (see src.server.room.encode_move).
+    `result` uses PGN notation: "1-0", "0-1", "1/2-1/2" or "*".
+    """
+
+    room_id: str
+    white: str
+    black: str
+    white_rating: int
+    black_rating: int
+    base: float | None
+    increment: float | None
+    started_at: float
+    ended_at: float
+    result: str
+    reason: str
+    moves: bytes
+
+
+class GameArchive:
+    """Append-only SQLite store for finished games.
+
+    `submit()` only puts the record on a queue, so it is safe to call from
+    the event loop. A background thread owns the SQLite connection and
+    commits the queued games in batches (one transaction per batch) with
+    the database in WAL mode.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        batch_size: int = ARCHIVE_BATCH_SIZE,
+        flush_interval: float = ARCHIVE_FLUSH_INTERVAL,
+        max_queue: int = ARCHIVE_QUEUE_MAX,
+    ) -> None:
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue: queue.Queue[GameRecord | None] = queue.Queue(maxsize=max_queue)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = ARCHIVE_STOP_TIMEOUT) -> None:
+        """Flush everything still queued and stop the writer (blocking).
+
+        A writer that died or stopped draining a full queue is given up on
+        after `timeout` seconds, so shutdown never hangs on it.
+        """
+
+        if self._thread is None:
+            return
+        if self._thread.is_alive():
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                pass
+            else:
+                self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, record: GameRecord) -> None:
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            dropped_games.inc()
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path)
+        db.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL only syncs at checkpoints: safe against app crashes, fast
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.executescript(SCHEMA)
+        return db
+
+    def _next_batch(self) -> tuple[List[GameRecord], bool]:
+        """Block for the first record, then gather more until full or stale.
+
+        Returns (batch, stop_requested).
+        """
+
+        record = self._queue.get()
+        if record is None:
+            return [], True
+
+        batch = [record]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                record = (
+                    self._queue.get(timeout=timeout)
+                    if timeout > 0
+                    else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+            if record is None:
+                return batch, True
+            batch.append(record)
+        return batch, False
+
+    def _write_loop(self) -> None:
+        db = self._connect()
+        try:
+            stop = False
+            while not stop:
+                batch, stop = self._next_batch()
+                if not batch:
+                    continue
+                with db:
+                    db.executemany(
+                        "INSERT OR IGNORE INTO games VALUES "
+                        "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        batch,
+                    )
+                archived_games.inc(len(batch))
+        finally:
+            db.close()
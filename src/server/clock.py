@@ -0,0 +1,137 @@
+import math
+from typing import Dict, Hashable, List
+
+
+# Resolution of the timing wheel (seconds per slot)
+WHEEL_TICK = 0.1
+# Number of slots; with WHEEL_TICK this spans ~7 minutes before entries wrap around
+WHEEL_SLOTS = 4096
+
+
+class GameClock:
+    """Chess clock with base time and per-move increment (Fischer).
+
+    Times are kept in seconds against a monotonic `now` passed in by the
+    caller, so the clock itself never reads the system time.
+    """
+
+    def __init__(self, base: float, increment: float) -> None:
+        self.base = base
+        self.increment = increment
+        self.remaining: Dict[str, float] = {"white": base, "black": base}
+        self.turn = "white"
+        # The clock starts running after White's first move
+        self.turn_started_at: float | None = None
+        self.flagged: str | None = None
+
+    @property
+    def running(self) -> bool:
+        return self.turn_started_at is not None and self.flagged is None
+
+    def press(self, color: str, now: float) -> None:
+        """`color` finished its move at `now`: charge elapsed time and switch sides."""
+
+        if self.running:
+            self.remaining[color] -= now - self.turn_started_at
+        self.remaining[color] += self.increment
+        self.turn = "black" if color == "white" else "white"
+        self.turn_started_at = now
+
+    def stop(self, now: float) -> None:
+        """Freeze both times at `now` (the game ended on the board)."""
+
+        if self.running:
+            self.remaining[self.turn] -= now - self.turn_started_at
+        self.turn_started_at = None
+
+    def flag(self) -> str:
+        """Stop the clock with the side to move out of time. Returns the loser."""
+
+        self.remaining[self.turn] = 0.0
+        self.flagged = self.turn
+        return self.turn
+
+    def deadline(self) -> float | None:
+        """Monotonic time at which the side to move runs out of time."""
+
+        if not self.running:
+            return None
+        return self.turn_started_at + self.remaining[self.turn]
+
+    def remaining_for(self, color: str, now: float) -> float:
+        remaining = self.remaining[color]
+        if self.running and color == self.turn:
+            remaining -= now - self.turn_started_at
+        return max(0.0, remaining)
+
+    def snapshot(self, now: float) -> dict:
+        """Clock state as sent to clients (milliseconds)."""
+
+        return {
+            "white": int(self.remaining_for("white", now) * 1000),
+            "black": int(self.remaining_for("black", now) * 1000),
+            "turn": self.turn,
+            "running": self.running,
+        }
+
+
+class TimingWheel:
+    """Hashed timing wheel: one shared timer for many deadlines.
+
+    Each key lives in the slot of its deadline tick modulo the wheel size.
+    Advancing the wheel only visits the slots that elapsed since the last
+    call, so a tick costs the handful of entries hashed into those slots
+    rather than a scan of every scheduled key. Scheduling and cancelling
+    are O(1).
+    """
+
+    def __init__(
+        self,
+        now: float,
+        tick: float = WHEEL_TICK,
+        slots: int = WHEEL_SLOTS,
+    ) -> None:
+        self.tick = tick
+        self._slots: List[Dict[Hashable, int]] = [{} for _ in range(slots)]
+        # key -> slot index, for O(1) cancel/reschedule
+        self._slot_of: Dict[Hashable, int] = {}
+        self._current_tick = int(now / tick)
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def schedule(self, key: Hashable, deadline: float) -> None:
+        """(Re)schedule `key` to expire at the monotonic time `deadline`."""
+
+        self.cancel(key)
+        deadline_tick = max(math.ceil(deadline / self.tick), self._current_tick + 1)
+        slot = deadline_tick % len(self._slots)
+        self._slots[slot][key] = deadline_tick
+        self._slot_of[key] = slot
+
+    def cancel(self, key: Hashable) -> None:
+        slot = self._slot_of.pop(key, None)
+        if slot is not None:
+            del self._slots[slot][key]
+
+    def advance(self, now: float) -> List[Hashable]:
+        """Move the wheel to `now` and return the keys that expired."""
+
+        target_tick = int(now / self.tick)
+        steps = min(target_tick - self._current_tick, len(self._slots))
+        expired = []
+
+        for step in range(1, steps + 1):
+            slot = self._slots[(self._current_tick + step) % len(self._slots)]
+            if not slot:
+                continue
+
+            # Entries from later laps around the wheel share the slot and stay put
+            for key, deadline_tick in list(slot.items()):
+                if deadline_tick <= target_tick:
+                    del slot[key]
+                    del self._slot_of[key]
+                    expired.append(key)
+
+        self._current_tick = max(self._current_tick, target_tick)
+        return expired
@@ -0,0 +1,145 @@
+import asyncio
+import json
+import time
+from typing import Callable
+
+from fastapi import WebSocket
+
+from src.server import metrics
+
+
+# Hard cap on queued outbound messages per connection; overflowing drops the client
+OUTBOUND_QUEUE_MAX = 256
+# Queue depth considered "behind"; staying above it for too long drops the client
+OUTBOUND_HIGH_WATER = 64
+# Seconds a connection may stay above the high-water mark before eviction
+SLOW_CONSUMER_GRACE = 5.0
+# Upper bound for the close handshake of an evicted (probably stalled) client
+CLOSE_TIMEOUT = 1.0
+
+slow_consumer_evictions = metrics.registry.counter(
+    "chess_slow_consumer_evictions_total",
+    "Connections dropped because their outbound queue stayed over the limit.",
+)
+
+
+class Connection:
+    """A websocket with its own bounded outbound queue and writer task.
+
+    `send()` never awaits: it only enqueues, so relaying to a slow or stalled
+    peer cannot block the sender's receive loop. The writer task drains the
+    queue at whatever pace the peer accepts; peers that fall too far behind
+    are evicted and `on_drop` is called so the server can clean up after them.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        on_drop: Callable[["Connection"], None] | None = None,
+        max_queue: int = OUTBOUND_QUEUE_MAX,
+        high_water: int = OUTBOUND_HIGH_WATER,
+        grace: float = SLOW_CONSUMER_GRACE,
+    ) -> None:
+        self.websocket = websocket
+        self.on_drop = on_drop
+        self.max_queue = max_queue
+        self.high_water = high_water
+        self.grace = grace
+
+        # Items are (encoded_text, received_at | None)
+        self._queue: asyncio.Queue[tuple[str, float | None]] = asyncio.Queue(
+            maxsize=max_queue
+        )
+        self._over_high_water_since: float | None = None
+        self._writer: asyncio.Task | None = None
+        # Background close handshake started by drop()
+        self._closer: asyncio.Task | None = None
+        self.closed = False
+        # Last time anything was received from the peer (heartbeat bookkeeping)
+        self.last_seen = time.monotonic()
+
+    def start(self) -> None:
+        self._writer = asyncio.create_task(self._write_loop())
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize()
+
+    def send(self, data: dict, received_at: float | None = None) -> bool:
+        """Queue a JSON message. Returns False if the connection was dropped."""
+
+        return self.send_text(json.dumps(data), received_at)
+
+    def send_text(self, text: str, received_at: float | None = None) -> bool:
+        """Queue an already encoded message. Returns False if the connection was dropped."""
+
+        if self.closed:
+            return False
+
+        try:
+            self._queue.put_nowait((text, received_at))
+        except asyncio.QueueFull:
+            self.evict()
+            return False
+
+        if self._queue.qsize() > self.high_water:
+            now = time.monotonic()
+            if self._over_high_water_since is None:
+                self._over_high_water_since = now
+            elif now - self._over_high_water_since > self.grace:
+                self.evict()
+                return False
+        else:
+            self._over_high_water_since = None
+
+        return True
+
+    async def _write_loop(self) -> None:
+        while True:
+            text, received_at = await self._queue.get()
+            try:
+                await self.websocket.send_text(text)
+            except Exception:
+                metrics.send_errors.inc()
+                self.close()
+                return
+
+            if received_at is not None:
+                metrics.relay_latency.observe(time.perf_counter() - received_at)
+
+            if self._queue.qsize() <= self.high_water:
+                self._over_high_water_since = None
+
+    def evict(self) -> None:
+        """Drop a slow consumer without waiting for it."""
+
+        if self.closed:
+            return
+
+        slow_consumer_evictions.inc()
+        self.drop()
+
+    def drop(self) -> None:
+        """Close the socket in the background and notify the server."""
+
+        if self.closed:
+            return
+
+        self.close()
+        self._closer = asyncio.create_task(self._close_socket())
+
+        if self.on_drop is not None:
+            self.on_drop(self)
+
+    async def _close_socket(self) -> None:
+        try:
+            await asyncio.wait_for(self.websocket.close(code=1008), CLOSE_TIMEOUT)
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        """Stop the writer task; queued messages are discarded."""
+
+        self.closed = True
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
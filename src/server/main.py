@@ -1,69 +1,578 @@
+import asyncio
+from contextlib import asynccontextmanager
+import json
+from pathlib import Path
 import secrets
-from typing import Dict, List
+import time
+from typing import Dict
 import uuid
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse
 import uvicorn
 
+from src.server import metrics
+from src.server.archive import GameArchive
+from src.server.clock import WHEEL_TICK, GameClock, TimingWheel
+from src.server.connection import Connection
+from src.server.matchmaking import Matchmaker, TimeControl, WaitingPlayer
+from src.server.room import Room
 
-app = FastAPI()
 
-waiting_queue: List[WebSocket] = []
-rooms: Dict[str, List[WebSocket]] = {}
+# How often the event loop lag probe wakes up (seconds)
+LOOP_LAG_PROBE_INTERVAL = 0.5
+# How often the sweeper pings every connection and reaps dead ones (seconds)
+HEARTBEAT_INTERVAL = 10.0
+# Connections silent for longer than this (no pong, no message) are reaped
+IDLE_TIMEOUT = 30.0
+# How long a dropped player's seat is kept for a reconnect before the game is abandoned
+RESUME_GRACE = 60.0
+# Time controls players may ask for (base seconds, Fischer increment seconds)
+TIME_CONTROLS: set[TimeControl] = {
+    (60.0, 0.0),
+    (180.0, 2.0),
+    (300.0, 3.0),
+    (600.0, 5.0),
+    (900.0, 10.0),
+}
+# Used when the client does not ask for (or asks for an unknown) time control
+DEFAULT_TIME_CONTROL: TimeControl = (300.0, 3.0)
+# Rating assumed for clients that do not send one, and the accepted range
+DEFAULT_RATING = 1500
+MIN_RATING, MAX_RATING = 100, 3500
+# SQLite file holding every finished online game
+ARCHIVE_PATH = Path(__file__).parent.parent.parent / "data" / "games.sqlite3"
 
+# Every open connection, waiting or matched (iterated by the sweeper)
+connections: set[Connection] = set()
+matchmaker = Matchmaker()
+rooms: Dict[str, Room] = {}
+# Room each matched connection belongs to (avoids scanning every room per message)
+room_of: Dict[Connection, Room] = {}
+# Room each spectator is watching
+watching: Dict[Connection, Room] = {}
+# Resume token -> room, for players reconnecting after a dropped connection
+resume_tokens: Dict[str, Room] = {}
+# Flag-fall deadlines of every running clock, keyed by room_id
+clock_wheel = TimingWheel(time.monotonic())
+archive = GameArchive(ARCHIVE_PATH)
 
-@app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    await websocket.accept()
+metrics.registry.gauge(
+    "chess_waiting_queue_depth",
+    "Players waiting for an opponent.",
+    callback=lambda: len(matchmaker),
+)
+metrics.registry.gauge(
+    "chess_active_rooms", "Rooms with a game in progress.", callback=lambda: len(rooms)
+)
+metrics.registry.gauge(
+    "chess_spectators", "Connections watching a game.", callback=lambda: len(watching)
+)
+metrics.registry.gauge(
+    "chess_archive_pending_games",
+    "Finished games waiting for the archive writer.",
+    callback=lambda: archive.pending,
+)
+reaped_connections = metrics.registry.counter(
+    "chess_reaped_connections_total",
+    "Connections closed by the sweeper after missing heartbeats.",
+)
+reaped_rooms = metrics.registry.counter(
+    "chess_reaped_rooms_total",
+    "Rooms removed by the sweeper because a player was already gone.",
+)
 
-    if waiting_queue:
-        opponent = waiting_queue.pop(0)
-        room_id = str(uuid.uuid4())
-        rooms[room_id] = [websocket, opponent]
+PING_TEXT = json.dumps({"type": "ping"})
 
-        opponent_color = secrets.choice(["white", "black"])
 
-        await opponent.send_json(
-            {
-                "type": "match_found",
-                "room_id": room_id,
-                "color": opponent_color,
-            }
+async def _monitor_event_loop_lag() -> None:
+    """Sleep for a fixed interval and record how late the loop woke us up."""
+
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(LOOP_LAG_PROBE_INTERVAL)
+        metrics.event_loop_lag.set(
+            max(0.0, loop.time() - start - LOOP_LAG_PROBE_INTERVAL)
         )
 
-        await websocket.send_json(
+
+def _sweep() -> None:
+    """Reap idle connections and abandoned rooms, pair players whose rating
+    windows have widened, then ping everyone left."""
+
+    now = time.monotonic()
+
+    for connection in list(connections):
+        # Spectators never have to talk; a dead one is noticed when its socket
+        # closes (uvicorn's protocol-level pings) or a write to it fails
+        if connection in watching:
+            continue
+        if now - connection.last_seen > IDLE_TIMEOUT:
+            reaped_connections.inc()
+            connection.drop()
+
+    for room in list(rooms.values()):
+        # Players closed without a clean disconnect lose their seat like a drop
+        for player in room.players:
+            if player.closed and room.color_of[player] not in room.absent:
+                _disconnect(player)
+
+        # Seats that were not reclaimed in time abandon the game
+        if room.absent and now - min(room.absent.values()) > RESUME_GRACE:
+            reaped_rooms.inc()
+            _close_room(room)
+
+    for first, second in matchmaker.match_waiting(now):
+        _start_room(first, second, now)
+
+    # A ping that overflows a stalled client evicts it from `connections`
+    for connection in list(connections):
+        connection.send_text(PING_TEXT)
+
+
+async def _heartbeat_sweeper() -> None:
+    while True:
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        _sweep()
+
+
+def _check_flags(now: float) -> None:
+    """Advance the clock wheel and end the games whose side to move ran out of time."""
+
+    for room_id in clock_wheel.advance(now):
+        room = rooms.get(room_id)
+        # A game that already ended cannot be lost on time any more
+        if room is None or room.clock is None or room.result is not None:
+            continue
+
+        deadline = room.clock.deadline()
+        if deadline is None:
+            continue
+        if deadline > now:
+            # Woken up early (tick rounding): put it back
+            clock_wheel.schedule(room_id, deadline)
+            continue
+
+        _flag(room, now)
+
+
+def _flag(room: Room, now: float) -> None:
+    """End the game on time: the side to move loses, everyone in the room is told."""
+
+    clock_wheel.cancel(room.room_id)
+    loser = room.clock.flag()
+    room.set_result("timeout", "black" if loser == "white" else "white")
+    text = _sequence(
+        room,
+        {
+            "type": "flag",
+            "loser": loser,
+            "winner": "black" if loser == "white" else "white",
+            "clock": room.clock.snapshot(now),
+        },
+    )
+    _broadcast(room.players, text)
+    _broadcast(room.spectators, text)
+
+
+async def _clock_ticker() -> None:
+    while True:
+        await asyncio.sleep(WHEEL_TICK)
+        _check_flags(time.monotonic())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    archive.start()
+    tasks = [
+        asyncio.create_task(_monitor_event_loop_lag()),
+        asyncio.create_task(_heartbeat_sweeper()),
+        asyncio.create_task(_clock_ticker()),
+    ]
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Flush the games still queued without blocking the loop
+        await asyncio.to_thread(archive.stop)
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+def _disconnect(connection: Connection, leaving: bool = False) -> None:
+    """Remove a connection from matchmaking/rooms.
+
+    A player whose connection drops keeps their seat for RESUME_GRACE
+    seconds so they can reconnect; a player `leaving` on purpose ends the
+    game right away. Safe to call more than once (normal disconnect after an
+    eviction, etc.).
+    """
+
+    connection.close()
+    connections.discard(connection)
+
+    if matchmaker.remove(connection) is not None:
+        return
+
+    watched_room = watching.pop(connection, None)
+    if watched_room is not None:
+        watched_room.spectators.discard(connection)
+        return
+
+    room = room_of.pop(connection, None)
+    if room is None:
+        return
+
+    room.absent[room.color_of[connection]] = time.monotonic()
+
+    # A deliberate leave, a finished game or an empty room has nothing to wait for
+    if leaving or room.result is not None or len(room.absent) == len(room.players):
+        _close_room(room)
+        return
+
+    for player in room.opponents_of(connection):
+        player.send({"type": "opponent_disconnected"})
+
+
+def _close_room(room: Room) -> None:
+    """End a room: notify whoever is still there, then archive the game."""
+
+    rooms.pop(room.room_id, None)
+    clock_wheel.cancel(room.room_id)
+    for token in room.tokens:
+        resume_tokens.pop(token, None)
+
+    for player in room.players:
+        room_of.pop(player, None)
+        color = room.color_of[player]
+        if color not in room.absent:
+            player.send({"type": "opponent_left"})
+            room.set_result("abandoned", color)
+
+    _broadcast(room.spectators, json.dumps({"type": "room_closed"}))
+    for spectator in room.spectators:
+        watching.pop(spectator, None)
+    room.spectators.clear()
+
+    archive.submit(room.to_record())
+
+
+def _broadcast(targets, text: str, received_at: float | None = None) -> None:
+    """Queue one already encoded message on every target connection.
+
+    The caller serializes the message once; each connection's writer task
+    then pushes it on its own, and a spectator that falls behind is evicted
+    by its own queue limits without slowing down the others.
+    """
+
+    # An evicted spectator leaves room.spectators while we are still sending
+    for target in list(targets):
+        target.send_text(text, received_at)
+
+
+def _start_room(first: WaitingPlayer, second: WaitingPlayer, now: float) -> None:
+    """Create a room for two matched players and tell both about it."""
+
+    for player in (first, second):
+        metrics.matchmaking_wait.observe(now - player.since)
+
+    if secrets.choice(["white", "black"]) == "white":
+        white, black = first, second
+    else:
+        white, black = second, first
+
+    base, increment = first.time_control
+    room_id = str(uuid.uuid4())
+    room = Room(
+        room_id,
+        white.key,
+        black.key,
+        GameClock(base, increment),
+        player_ids={"white": white.player_id, "black": black.player_id},
+        ratings={"white": white.rating, "black": black.rating},
+    )
+    rooms[room_id] = room
+    room_of[white.key] = room
+    room_of[black.key] = room
+    for token in room.tokens:
+        resume_tokens[token] = room
+
+    clock_snapshot = room.clock.snapshot(now)
+    for player in room.players:
+        player.send(
             {
                 "type": "match_found",
                 "room_id": room_id,
-                "color": "white" if opponent_color == "black" else "black",
+                "color": room.color_of[player],
+                "time_control": {"base": base, "increment": increment},
+                "clock": clock_snapshot,
+                "resume_token": room.token_for(room.color_of[player]),
             }
         )
+
+
+def _resume(connection: Connection, token: str, last_seq: int) -> bool:
+    """Put a reconnecting player back in their seat and send what they missed."""
+
+    room = resume_tokens.get(token)
+    if room is None:
+        return False
+
+    color = room.tokens[token]
+    previous = room.player_for(color)
+    # Forget the old connection first so dropping it does not vacate the seat again
+    room_of.pop(previous, None)
+    room.seat(color, connection)
+    room_of[connection] = room
+    previous.drop()
+
+    connection.send(
+        {
+            "type": "resumed",
+            "room_id": room.room_id,
+            "color": color,
+            # Not "seq": this message is not sequenced itself, it announces the delta
+            "last_seq": room.seq,
+            "clock": room.clock.snapshot(time.monotonic()) if room.clock else None,
+        }
+    )
+    # Only the delta: every sequenced message after the last one the client saw
+    for text in room.log[max(0, last_seq) :]:
+        connection.send_text(text)
+
+    for player in room.opponents_of(connection):
+        player.send({"type": "opponent_reconnected"})
+    return True
+
+
+def _requested_player(connection: Connection, websocket: WebSocket) -> WaitingPlayer:
+    """Build the matchmaking entry from the ?player=&rating=&base=&increment= query string."""
+
+    params = websocket.query_params
+
+    # Anonymous clients get a throwaway id so archived games can still be told apart
+    player_id = params.get("player", "")[:64] or f"guest-{uuid.uuid4().hex[:8]}"
+
+    try:
+        rating = int(params.get("rating", DEFAULT_RATING))
+    except ValueError:
+        rating = DEFAULT_RATING
+    rating = min(MAX_RATING, max(MIN_RATING, rating))
+
+    try:
+        time_control = (
+            float(params.get("base", DEFAULT_TIME_CONTROL[0])),
+            float(params.get("increment", DEFAULT_TIME_CONTROL[1])),
+        )
+    except ValueError:
+        time_control = DEFAULT_TIME_CONTROL
+    if time_control not in TIME_CONTROLS:
+        time_control = DEFAULT_TIME_CONTROL
+
+    return WaitingPlayer(
+        connection, rating, time_control, time.monotonic(), player_id
+    )
+
+
+def _sequence(room: Room, data: dict) -> str:
+    """Number a game message, append it to the room's log and encode it once."""
+
+    data["seq"] = room.seq + 1
+    text = json.dumps(data)
+    room.log.append(text)
+    return text
+
+
+def _relay_text(
+    room: Room, connection: Connection, data: dict, received_at: float
+) -> str | None:
+    """Prepare a move or promotion for relaying.
+
+    Charges the mover's clock for moves, stamps the message with the mover's
+    color, the clock state, the time spent in the server so far and a
+    sequence number, and acknowledges it to the mover. Returns the text to
+    relay, or None if the message must be dropped because the game was lost
+    on time.
+    """
+
+    clock = room.clock
+    color = room.color_of[connection]
+    ack = {"type": "ack"}
+
+    # The mover's send time is only meaningful to the mover: echo it in the ack
+    sent_at = data.pop("t", None)
+    if isinstance(sent_at, (int, float)):
+        ack["t"] = sent_at
+
+    if clock is not None:
+        if clock.flagged is not None:
+            return None
+
+        now = time.monotonic()
+        # Once the game is over the clock stays stopped
+        if data.get("type") == "move" and color == clock.turn and room.result is None:
+            deadline = clock.deadline()
+            if deadline is not None and now >= deadline:
+                # Out of time before the wheel noticed: the move is too late
+                _flag(room, now)
+                return None
+            clock.press(color, now)
+            clock_wheel.schedule(room.room_id, clock.deadline())
+        data["clock"] = ack["clock"] = clock.snapshot(now)
+
+    data["color"] = color
+    data["relay_ms"] = round((time.perf_counter() - received_at) * 1000, 3)
+    text = _sequence(room, data)
+
+    # The mover learns the sequence number (and its clock) of what it sent
+    ack["seq"] = room.seq
+    connection.send(ack)
+    return text
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint() -> str:
+    return metrics.registry.render()
+
+
+@app.websocket("/ws")
+async def websocket_endpoint(websocket: WebSocket):
+    await websocket.accept()
+    connection = Connection(websocket, on_drop=_disconnect)
+    connection.start()
+    connections.add(connection)
+    metrics.active_connections.inc()
+
+    token = websocket.query_params.get("resume")
+    if token is not None:
+        try:
+            last_seq = int(websocket.query_params.get("last_seq", 0))
+        except ValueError:
+            last_seq = 0
+        if not _resume(connection, token, last_seq):
+            connection.send({"type": "resume_failed"})
     else:
-        waiting_queue.append(websocket)
-        await websocket.send_json({"type": "waiting_for_opponent"})
+        player = _requested_player(connection, websocket)
+        opponent = matchmaker.pair(player, player.since)
+        if opponent is not None:
+            _start_room(opponent, player, player.since)
+        else:
+            connection.send({"type": "waiting_for_opponent"})
+
+    leaving = False
 
     try:
-        while True:
-            data = await websocket.receive_json()
+        while not connection.closed:
+            try:
+                text = await websocket.receive_text()
+            except RuntimeError:
+                # Receiving on a socket we already closed (eviction)
+                break
+            received_at = time.perf_counter()
+            connection.last_seen = time.monotonic()
+
+            try:
+                data = json.loads(text)
+            except json.JSONDecodeError:
+                continue
+
+            if not isinstance(data, dict):
+                continue
+
+            # Heartbeat replies only refresh last_seen; they are not relayed
+            if data.get("type") == "pong":
+                continue
 
-            for room_id, players in rooms.items():
-                if websocket in players:
-                    for player in players:
-                        if player != websocket:
-                            await player.send_json(data)
+            # RTT probe from the client: answer at once, echoing its send time
+            if data.get("type") == "ping":
+                connection.send({"type": "pong", "t": data.get("t")})
+                continue
+
+            room = room_of.get(connection)
+            if room is None:
+                continue
+
+            msg_type = data.get("type")
+            if msg_type == "leave":
+                leaving = True
+                break
+
+            if msg_type == "game_over":
+                # Result detected by the clients' rules engine: archived, not relayed
+                room.set_result(data.get("reason", "unknown"), data.get("winner"))
+                if room.clock is not None:
+                    room.clock.stop(time.monotonic())
+                    clock_wheel.cancel(room.room_id)
+                continue
+
+            if msg_type in ("move", "promotion"):
+                text = _relay_text(room, connection, data, received_at)
+                if text is None:
+                    continue
+                if msg_type == "move":
+                    room.record_move(data)
+                else:
+                    room.record_promotion(data.get("piece"))
+
+            # Game messages were re-encoded with their sequence number; others go as-is
+            for player in room.opponents_of(connection):
+                player.send_text(text, received_at)
+                metrics.messages_relayed.inc()
+            _broadcast(room.spectators, text)
 
     except WebSocketDisconnect:
-        if websocket in waiting_queue:
-            waiting_queue.remove(websocket)
-        else:
-            for room_id, players in rooms.items():
-                if websocket in players:
-                    players.remove(websocket)
+        pass
+    finally:
+        _disconnect(connection, leaving)
+        metrics.active_connections.dec()
+
 
-                    for player in players:
-                        await player.send_json({"type": "opponent_left"})
+@app.websocket("/ws/watch/{room_id}")
+async def watch_endpoint(websocket: WebSocket, room_id: str):
+    """Spectate a room: a snapshot first, then every message relayed in it."""
 
-                    del rooms[room_id]
+    await websocket.accept()
+
+    room = rooms.get(room_id)
+    if room is None:
+        await websocket.send_json({"type": "error", "reason": "room_not_found"})
+        await websocket.close()
+        return
+
+    connection = Connection(websocket, on_drop=_disconnect)
+    connection.start()
+    connections.add(connection)
+    metrics.active_connections.inc()
+
+    room.spectators.add(connection)
+    watching[connection] = room
+    connection.send(
+        {
+            "type": "snapshot",
+            "room_id": room_id,
+            "players": room.player_ids,
+            "clock": room.clock.snapshot(time.monotonic()) if room.clock else None,
+            **room.position(),
+        }
+    )
+
+    try:
+        # Anything a spectator sends is ignored; the loop only waits for the close
+        while not connection.closed:
+            try:
+                await websocket.receive_text()
+            except RuntimeError:
+                # Receiving on a socket we already closed (eviction)
+                break
+            connection.last_seen = time.monotonic()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        _disconnect(connection)
+        metrics.active_connections.dec()
 
 
 if __name__ == "__main__":
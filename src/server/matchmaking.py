@@ -0,0 +1,190 @@
+from bisect import bisect_left, insort
+from typing import Dict, Hashable, List, Tuple
+
+
+# Time control as (base seconds, increment seconds); players only meet inside one
+TimeControl = Tuple[float, float]
+
+# Rating difference accepted immediately
+BASE_RATING_WINDOW = 100
+# How fast the accepted difference grows while a player waits (rating points per second)
+RATING_WINDOW_GROWTH = 10
+# The window never grows beyond this
+MAX_RATING_WINDOW = 600
+
+
+def rating_window(waited: float) -> float:
+    """Largest rating difference acceptable after waiting `waited` seconds."""
+
+    return min(MAX_RATING_WINDOW, BASE_RATING_WINDOW + RATING_WINDOW_GROWTH * waited)
+
+
+class WaitingPlayer:
+    """A queued player. `key` identifies it (the server uses its Connection)."""
+
+    __slots__ = ("key", "rating", "time_control", "since", "player_id")
+
+    def __init__(
+        self,
+        key: Hashable,
+        rating: int,
+        time_control: TimeControl,
+        since: float,
+        player_id: str = "",
+    ) -> None:
+        self.key = key
+        self.rating = rating
+        self.time_control = time_control
+        self.since = since
+        self.player_id = player_id
+
+
+class MatchmakingPool:
+    """Waiting players of one time control, indexed by rating.
+
+    Players are grouped in one bucket per exact rating (FIFO inside the
+    bucket), and the distinct ratings are kept in a sorted list. Looking up
+    the nearest rating is a bisect; the sorted list only changes when a
+    rating bucket is created or emptied, and it holds at most a few thousand
+    distinct ratings however many players are queued.
+    """
+
+    def __init__(self) -> None:
+        self._ratings: List[int] = []
+        self._buckets: Dict[int, Dict[Hashable, WaitingPlayer]] = {}
+        # Every queued player in arrival order
+        self._players: Dict[Hashable, WaitingPlayer] = {}
+
+    def __len__(self) -> int:
+        return len(self._players)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._players
+
+    def add(self, player: WaitingPlayer) -> None:
+        bucket = self._buckets.get(player.rating)
+        if bucket is None:
+            bucket = self._buckets[player.rating] = {}
+            insort(self._ratings, player.rating)
+        bucket[player.key] = player
+        self._players[player.key] = player
+
+    def remove(self, key: Hashable) -> WaitingPlayer | None:
+        player = self._players.pop(key, None)
+        if player is None:
+            return None
+
+        bucket = self._buckets[player.rating]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[player.rating]
+            del self._ratings[bisect_left(self._ratings, player.rating)]
+        return player
+
+    def find_match(
+        self, rating: int, waited: float, now: float, exclude: Hashable = None
+    ) -> WaitingPlayer | None:
+        """Nearest-rated waiting player acceptable to a player who waited `waited`.
+
+        A pair is acceptable when the rating difference fits the window of
+        whichever of the two has waited longer.
+        """
+
+        ratings = self._ratings
+        high = bisect_left(ratings, rating)
+        low = high - 1
+
+        while low >= 0 or high < len(ratings):
+            # Step outwards from `rating`, always taking the closer side first
+            if high >= len(ratings) or (
+                low >= 0 and rating - ratings[low] <= ratings[high] - rating
+            ):
+                candidate_rating = ratings[low]
+                low -= 1
+            else:
+                candidate_rating = ratings[high]
+                high += 1
+
+            difference = abs(candidate_rating - rating)
+            if difference > MAX_RATING_WINDOW:
+                return None
+
+            # Oldest first: it has the widest window in this bucket
+            for candidate in self._buckets[candidate_rating].values():
+                if candidate.key == exclude:
+                    continue
+                if difference <= rating_window(max(waited, now - candidate.since)):
+                    return candidate
+                break
+
+        return None
+
+    def match_waiting(self, now: float) -> List[Tuple[WaitingPlayer, WaitingPlayer]]:
+        """Pair players already in the pool whose windows have widened enough."""
+
+        pairs = []
+        for player in list(self._players.values()):
+            if player.key not in self._players:
+                continue
+
+            opponent = self.find_match(
+                player.rating, now - player.since, now, exclude=player.key
+            )
+            if opponent is not None:
+                self.remove(player.key)
+                self.remove(opponent.key)
+                pairs.append((opponent, player))
+        return pairs
+
+
+class Matchmaker:
+    """One rating-indexed pool per time control."""
+
+    def __init__(self) -> None:
+        self.pools: Dict[TimeControl, MatchmakingPool] = {}
+        self._pool_of: Dict[Hashable, MatchmakingPool] = {}
+
+    def __len__(self) -> int:
+        return len(self._pool_of)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._pool_of
+
+    def pair(self, player: WaitingPlayer, now: float) -> WaitingPlayer | None:
+        """Match an arriving player, or queue it if nobody suitable is waiting.
+
+        Returns the opponent (already removed from its pool) or None.
+        """
+
+        pool = self.pools.get(player.time_control)
+        if pool is None:
+            pool = self.pools[player.time_control] = MatchmakingPool()
+
+        opponent = pool.find_match(player.rating, 0.0, now)
+        if opponent is not None:
+            pool.remove(opponent.key)
+            del self._pool_of[opponent.key]
+            return opponent
+
+        pool.add(player)
+        self._pool_of[player.key] = pool
+        return None
+
+    def remove(self, key: Hashable) -> WaitingPlayer | None:
+        pool = self._pool_of.pop(key, None)
+        if pool is None:
+            return None
+        return pool.remove(key)
+
+    def match_waiting(self, now: float) -> List[Tuple[WaitingPlayer, WaitingPlayer]]:
+        pairs = []
+        for time_control, pool in list(self.pools.items()):
+            for first, second in pool.match_waiting(now):
+                del self._pool_of[first.key]
+                del self._pool_of[second.key]
+                pairs.append((first, second))
+
+            # Drop pools of time controls nobody is waiting for any more
+            if not pool:
+                del self.pools[time_control]
+        return pairs
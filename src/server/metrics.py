@@ -0,0 +1,191 @@
+"""Minimal Prometheus-compatible metrics for the matchmaking server.
+
+The instruments here are deliberately tiny: updating a counter is a single
+attribute add and observing a histogram is a bisect plus two adds, so they
+can be called from the websocket hot loop without measurable overhead.
+Rendering to the Prometheus text format only happens when /metrics is scraped.
+"""
+
+from bisect import bisect_left
+from typing import Callable, List, Sequence
+
+
+# Default buckets (seconds) tuned for sub-millisecond relay latencies
+LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+)
+
+# Matchmaking waits are human-scale: seconds to minutes
+WAIT_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonically increasing value."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.value = 0
+
+    def inc(self, amount: int | float = 1) -> None:
+        self.value += amount
+
+    def samples(self) -> List[str]:
+        return [f"{self.name} {_format_value(self.value)}"]
+
+
+class Gauge:
+    """Value that can go up and down.
+
+    If `callback` is given, the value is read from it at scrape time instead
+    of being tracked on every change (useful for len() of server structures).
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], float] | None = None,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.value = 0
+        self._callback = callback
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def samples(self) -> List[str]:
+        value = self._callback() if self._callback is not None else self.value
+        return [f"{self.name} {_format_value(value)}"]
+
+
+class Histogram:
+    """Cumulative histogram with fixed upper bounds."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        # One slot per bucket plus the implicit +Inf bucket
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        # Counts are stored per bucket and only made cumulative at scrape time
+        self._counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self._counts):
+            cumulative += count
+            lines.append(
+                f'{self.name}_bucket{{le="{_format_value(bound)}"}} {cumulative}'
+            )
+        lines.append(f"{self.name}_sum {_format_value(self.sum)}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds every instrument and renders them in Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._metrics: list = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        return self.register(Counter(name, documentation))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], float] | None = None,
+    ) -> Gauge:
+        return self.register(Gauge(name, documentation, callback))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry shared by every server module
+registry = MetricsRegistry()
+
+active_connections = registry.gauge(
+    "chess_active_connections", "Number of open websocket connections."
+)
+messages_relayed = registry.counter(
+    "chess_messages_relayed_total", "Messages forwarded to an opponent."
+)
+send_errors = registry.counter("chess_send_errors_total", "Failed websocket sends.")
+relay_latency = registry.histogram(
+    "chess_relay_latency_seconds",
+    "Time from receiving a message to finishing its relay.",
+)
+matchmaking_wait = registry.histogram(
+    "chess_matchmaking_wait_seconds",
+    "Time a player spent in the waiting queue before being matched.",
+    buckets=WAIT_BUCKETS,
+)
+event_loop_lag = registry.gauge(
+    "chess_event_loop_lag_seconds",
+    "Delay between the scheduled and actual wake-up of the lag probe.",
+)
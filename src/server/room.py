@@ -0,0 +1,194 @@
+import secrets
+import time
+from typing import Dict, List
+
+from src.chess.fen import board_to_fen, square_name
+from src.chess.game_logic import GameLogic
+from src.server.archive import GameRecord
+from src.server.clock import GameClock
+from src.server.connection import Connection
+
+
+# Promotion piece codes stored in the top bits of a packed move
+PROMOTION_CODES = {"queen": 1, "rook": 2, "bishop": 3, "knight": 4}
+PROMOTION_KINDS = {code: kind for kind, code in PROMOTION_CODES.items()}
+
+# Bytes per packed move
+MOVE_RECORD_SIZE = 2
+
+
+def encode_move(from_square: int, to_square: int, promotion: str | None = None) -> bytes:
+    """Pack a move into 2 bytes: from (6 bits) | to (6 bits) | promotion (3 bits).
+
+    Squares are row * 8 + col in board coordinates (row 0 is Black's back rank).
+    """
+
+    value = from_square | (to_square << 6) | (PROMOTION_CODES.get(promotion, 0) << 12)
+    return value.to_bytes(MOVE_RECORD_SIZE, "little")
+
+
+def decode_moves(moves: bytes) -> List[tuple[int, int, str | None]]:
+    """Unpack a move log into (from_square, to_square, promotion) tuples."""
+
+    decoded = []
+    for offset in range(0, len(moves), MOVE_RECORD_SIZE):
+        value = int.from_bytes(moves[offset : offset + MOVE_RECORD_SIZE], "little")
+        decoded.append(
+            (value & 0x3F, (value >> 6) & 0x3F, PROMOTION_KINDS.get(value >> 12))
+        )
+    return decoded
+
+
+def _square(coords) -> int | None:
+    """row * 8 + col for a [row, col] pair from the wire, or None if malformed."""
+
+    if not isinstance(coords, list) or len(coords) != 2:
+        return None
+    row, col = coords
+    if not (isinstance(row, int) and isinstance(col, int)):
+        return None
+    if not (0 <= row < 8 and 0 <= col < 8):
+        return None
+    return row * 8 + col
+
+
+class Room:
+    """A game in progress between two connections."""
+
+    def __init__(
+        self,
+        room_id: str,
+        white: Connection,
+        black: Connection,
+        clock: GameClock | None = None,
+        player_ids: Dict[str, str] | None = None,
+        ratings: Dict[str, int] | None = None,
+    ) -> None:
+        self.room_id = room_id
+        self.players: List[Connection] = [white, black]
+        self.color_of: Dict[Connection, str] = {white: "white", black: "black"}
+        self.clock = clock
+        self.player_ids = player_ids or {"white": "", "black": ""}
+        self.ratings = ratings or {"white": 0, "black": 0}
+        self.started_at = time.time()
+
+        # Append-only packed move log (MOVE_RECORD_SIZE bytes per move)
+        self.moves = bytearray()
+        # (reason, winner) once known; winner is None for draws
+        self.result: tuple[str, str | None] | None = None
+
+        # Resume token of each seat (handed out with match_found): token -> color
+        self.tokens: Dict[str, str] = {
+            secrets.token_urlsafe(16): color for color in ("white", "black")
+        }
+        # Every sequenced message relayed in the room; the message with seq N is log[N - 1]
+        self.log: List[str] = []
+        # Seats whose connection dropped, with the monotonic time it happened
+        self.absent: Dict[str, float] = {}
+
+        # Connections watching the game; they receive every relayed message
+        self.spectators: set[Connection] = set()
+        # Bumped on every change to `moves`; keys the cached snapshot position
+        self._moves_version = 0
+        # (moves version, position) of the last snapshot, so joiners share one replay
+        self._position_cache: tuple[int, dict] | None = None
+
+    def opponents_of(self, connection: Connection) -> List[Connection]:
+        return [player for player in self.players if player is not connection]
+
+    def token_for(self, color: str) -> str:
+        return next(token for token, seat in self.tokens.items() if seat == color)
+
+    def player_for(self, color: str) -> Connection:
+        return next(player for player, seat in self.color_of.items() if seat == color)
+
+    def seat(self, color: str, connection: Connection) -> Connection:
+        """Put a (reconnected) connection in `color`'s seat. Returns the previous one."""
+
+        previous = self.player_for(color)
+        self.players[self.players.index(previous)] = connection
+        del self.color_of[previous]
+        self.color_of[connection] = color
+        self.absent.pop(color, None)
+        return previous
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the last sequenced message."""
+
+        return len(self.log)
+
+    def record_move(self, data: dict) -> bool:
+        """Append a relayed move to the log. Returns False if it is malformed."""
+
+        from_square = _square(data.get("from"))
+        to_square = _square(data.get("to"))
+        if from_square is None or to_square is None:
+            return False
+        self.moves += encode_move(from_square, to_square)
+        self._moves_version += 1
+        return True
+
+    def record_promotion(self, piece: str) -> None:
+        """Set the promotion piece of the last move (sent right after the move)."""
+
+        if not self.moves or piece not in PROMOTION_CODES:
+            return
+        last = int.from_bytes(self.moves[-MOVE_RECORD_SIZE:], "little") & 0x0FFF
+        last |= PROMOTION_CODES[piece] << 12
+        self.moves[-MOVE_RECORD_SIZE:] = last.to_bytes(MOVE_RECORD_SIZE, "little")
+        self._moves_version += 1
+
+    def position(self) -> dict:
+        """Current FEN and UCI move list, rebuilt from the move log when it changed."""
+
+        cache = self._position_cache
+        if cache is not None and cache[0] == self._moves_version:
+            return cache[1]
+
+        logic = GameLogic()
+        uci_moves = []
+        for from_square, to_square, promotion in decode_moves(self.moves):
+            from_row, from_col = divmod(from_square, 8)
+            to_row, to_col = divmod(to_square, 8)
+            logic.apply_move((from_row, from_col), (to_row, to_col), promotion)
+
+            uci = square_name(from_row, from_col) + square_name(to_row, to_col)
+            if promotion is not None:
+                uci += "n" if promotion == "knight" else promotion[0]
+            uci_moves.append(uci)
+
+        position = {
+            "fen": board_to_fen(logic.board, logic.current_turn),
+            "moves": uci_moves,
+        }
+        self._position_cache = (self._moves_version, position)
+        return position
+
+    def set_result(self, reason: str, winner: str | None) -> None:
+        """Record how the game ended; the first result reported wins."""
+
+        if self.result is None:
+            self.result = (reason, winner)
+
+    def to_record(self) -> GameRecord:
+        if self.result is None:
+            result, reason = "*", "unfinished"
+        else:
+            reason, winner = self.result
+            result = {"white": "1-0", "black": "0-1"}.get(winner, "1/2-1/2")
+
+        return GameRecord(
+            room_id=self.room_id,
+            white=self.player_ids["white"],
+            black=self.player_ids["black"],
+            white_rating=self.ratings["white"],
+            black_rating=self.ratings["black"],
+            base=self.clock.base if self.clock else None,
+            increment=self.clock.increment if self.clock else None,
+            started_at=self.started_at,
+            ended_at=time.time(),
+            result=result,
+            reason=reason,
+            moves=bytes(self.moves),
+        )
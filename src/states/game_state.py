@@ -1,3 +1,5 @@
+from typing import NamedTuple
+
 import pygame
 from src.core.state import State
 from src.core.chess_session import ChessSession, OnlineChessSession
@@ -9,6 +11,28 @@ from src.ui.button_renderer import ButtonRenderer
 from src.ui.overlay_game_over_notification_renderer import GameOverNotificationRenderer
 
 from src.utils import settings
+from src.utils.asset_manager import assets
+from src.utils.sound_bank import sounds
+
+
+# Keys stepping through the game (undo / redo one ply, go to its start / end)
+NAVIGATION_KEYS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_HOME, pygame.K_END)
+
+
+class _Frame(NamedTuple):
+    """What a rendered frame showed, compared between frames to find dirty regions."""
+
+    # Piece object (or None) on each square, row-major
+    position: tuple
+    # (row, col, color) of every outlined square
+    highlights: frozenset
+    # (piece, mouse position, origin square) while dragging, else None
+    drag: tuple | None
+    button_hover: bool
+    # Every text line drawn in the sidebar (clocks, notices, latency, ply counter)
+    sidebar: tuple
+    # Game-over overlay / promotion modal state; any change repaints everything
+    overlays: tuple
 
 
 class GameState(State):
@@ -32,36 +56,53 @@ class GameState(State):
             text="Quit to Menu",
         )
         self.game_over_notification = GameOverNotificationRenderer(None)
-
-        self.sounds = {
-            "entry": pygame.mixer.Sound(str(settings.SOUNDS_PATH / "notify.mp3")),
-            "move": pygame.mixer.Sound(str(settings.SOUNDS_PATH / "move-self.mp3")),
-            "capture": pygame.mixer.Sound(str(settings.SOUNDS_PATH / "capture.mp3")),
-            "check": pygame.mixer.Sound(str(settings.SOUNDS_PATH / "move-check.mp3")),
-            "checkmate": pygame.mixer.Sound(
-                str(settings.SOUNDS_PATH / "checkmate.mp3")
-            ),
-            "castling": pygame.mixer.Sound(str(settings.SOUNDS_PATH / "castle.mp3")),
-        }
+        # Latency overlay for online games, toggled with F3
+        self.show_latency = settings.SHOW_LATENCY_OVERLAY
 
         self.dragging = False
         self.drag_piece = None
         self.drag_origin = None  # (row, col)
         self.mouse_pos = (0, 0)
+        # Origin square of a premove being entered (by drag or click-click)
+        self.premove_origin = None  # (row, col)
+        # logic.position_version the premove origin was picked in
+        self._premove_origin_version = 0
+        # What the last rendered frame showed (for dirty_rects)
+        self._drawn_frame: _Frame | None = None
         # Track last move and game-over state to trigger sounds once
         self._last_move_seen = self.logic.last_move
         self._was_game_over = self.logic.game_over
 
     def enter(self):
-        self.sounds["entry"].play()
+        sounds.play("entry")
 
     def exit(self):
         pass
 
     def handle_event(self, event):
+        # Apply opponent moves the moment they arrive instead of on the next frame
+        if event.type == settings.NETWORK_MESSAGE_EVENT:
+            if isinstance(self.session, OnlineChessSession):
+                self.session.process_messages()
+            return
+
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            self.show_latency = not self.show_latency
+            return
+
+        if event.type == pygame.KEYDOWN and event.key in NAVIGATION_KEYS:
+            self._navigate(event.key)
+            return
+
         if event.type == pygame.MOUSEBUTTONDOWN:
             x, y = event.pos
 
+            # Right click cancels queued premoves
+            if event.button == 3 and (self.session.premoves or self.premove_origin):
+                self.session.clear_premoves()
+                self.premove_origin = None
+                return
+
             # Determine if board should be rendered from Black's perspective
             flipped = getattr(self.session, "local_color", None) == "black"
 
@@ -104,6 +145,11 @@ class GameState(State):
                 row = screen_row
                 col = screen_col
 
+            # Opponent's turn (online / vs AI): input queues premoves instead
+            if self.session.can_premove():
+                self._press_premove(row, col, event.pos)
+                return
+
             if 0 <= row < 8 and 0 <= col < 8:
                 piece = self.logic.board.get_piece(row, col)
 
@@ -139,7 +185,9 @@ class GameState(State):
                     row = screen_row
                     col = screen_col
 
-                if 0 <= row < 8 and 0 <= col < 8:
+                if self.premove_origin is not None:
+                    self._release_premove(row, col)
+                elif 0 <= row < 8 and 0 <= col < 8:
                     # Drop on a board square: let the session/logic decide if it's a valid move
                     self.session.handle_board_click(row, col)
                 else:
@@ -151,6 +199,88 @@ class GameState(State):
                 self.drag_piece = None
                 self.drag_origin = None
 
+    def _navigate(self, key):
+        """Take back / replay plies (local games). A move played from an earlier
+        ply replaces the rest of the game."""
+
+        if not self.session.can_navigate():
+            return
+
+        stack = self.logic.move_stack
+        target = {
+            pygame.K_LEFT: stack.ply - 1,
+            pygame.K_RIGHT: stack.ply + 1,
+            pygame.K_HOME: 0,
+            pygame.K_END: len(stack),
+        }[key]
+
+        # A drag in progress belongs to the position being left
+        self.dragging = False
+        self.drag_piece = None
+        self.drag_origin = None
+        self.logic.go_to_ply(max(0, target))
+
+    def _navigation_text(self):
+        stack = self.logic.move_stack
+        if not self.session.can_navigate() or stack.ply == len(stack):
+            return None
+        return f"Ply {stack.ply} / {len(stack)}"
+
+    def _render_navigation(self, screen):
+        """Show where in the game the board is while stepping back through it."""
+
+        text = self._navigation_text()
+        if text is None:
+            return
+
+        text_surface = assets.text(text, 32, (240, 217, 181))
+        x = self.button_exit.rect.x
+        y = settings.START_GRID_BOARD_POS[1] + settings.TILESIZE * 4
+        screen.blit(text_surface, (x, y))
+
+    def _press_premove(self, row, col, pos):
+        """Mouse down during the opponent's turn: pick a premove origin or target."""
+
+        if not (0 <= row < 8 and 0 <= col < 8):
+            self.premove_origin = None
+            return
+
+        piece = self.session.premove_piece_at(row, col)
+
+        # Second click of a click-click premove (clicking another own piece reselects)
+        if self.premove_origin is not None and piece is None:
+            self.session.queue_premove(*self.premove_origin, row, col)
+            self.premove_origin = None
+            return
+
+        if piece is None:
+            return
+
+        self.premove_origin = (row, col)
+        self._premove_origin_version = self.logic.position_version
+        self.dragging = True
+        self.drag_piece = piece
+        self.drag_origin = (row, col)
+        self.mouse_pos = pos
+
+    def _release_premove(self, row, col):
+        """Drop of a premove drag; if the opponent moved meanwhile, it is a normal move."""
+
+        if not (0 <= row < 8 and 0 <= col < 8):
+            self.premove_origin = None
+            return
+
+        if (row, col) == self.premove_origin:
+            # Plain click on the piece: wait for the target square
+            return
+
+        if self.session.can_premove():
+            self.session.queue_premove(*self.premove_origin, row, col)
+        else:
+            self.session.handle_board_click(*self.premove_origin)
+            self.session.handle_board_click(row, col)
+        self.premove_origin = None
+
     def update(self, dt):
         # Update exit button hover state
         self.button_exit.update(pygame.mouse.get_pos())
@@ -161,6 +291,18 @@ class GameState(State):
 
         # Let the session update itself (AI move, online opponent move, etc.)
         self.session.update(dt)
+        # A new turn: have the session work out its legal moves before the first click
+        self.session.precompute_legal_moves()
+
+        # The first click of a click-click premove was picked in a position that
+        # is gone: its square may now be empty or hold another piece. (A premove
+        # still being dragged is checked on release, as a normal move if needed.)
+        if (
+            self.premove_origin is not None
+            and not self.dragging
+            and self.logic.position_version != self._premove_origin_version
+        ):
+            self.premove_origin = None
 
         # In online games, if the connection is closed (e.g. opponent left),
         # send the player back to the home menu.
@@ -183,22 +325,22 @@ class GameState(State):
                 # Checkmate sound will be handled below
                 pass
             elif getattr(self.logic, "last_move_was_castling", False):
-                self.sounds["castling"].play()
+                sounds.play("castling")
             elif getattr(self.logic, "last_move_was_capture", False):
-                self.sounds["capture"].play()
+                sounds.play("capture")
             else:
                 # If the side to move is in check after this move, play check sound
                 if hasattr(self.logic, "is_in_check") and self.logic.is_in_check():
-                    self.sounds["check"].play()
+                    sounds.play("check")
                 else:
-                    self.sounds["move"].play()
+                    sounds.play("move")
 
             self._last_move_seen = new_last_move
 
         # Play game over sound once, when the game transitions to over
         if self.logic.game_over and not prev_game_over:
             if self.logic.result and self.logic.result[0] == "checkmate":
-                self.sounds["checkmate"].play()
+                sounds.play("checkmate")
 
         self._was_game_over = self.logic.game_over
 
@@ -211,17 +353,14 @@ class GameState(State):
         self.board_renderer.draw_highlights(
             screen, self.logic.valid_moves, flipped=flipped
         )
+        self._render_premoves(screen, flipped)
 
         dragging_piece = self.drag_piece if self.dragging else None
 
-        for row in range(8):
-            for col in range(8):
-                piece = self.logic.board.get_piece(row, col)
-                if piece:
-                    # When dragging, don't draw the piece at its board square
-                    if dragging_piece is not None and piece is dragging_piece:
-                        continue
-                    self.piece_renderer.draw(screen, piece, flipped=flipped)
+        # When dragging, don't draw the piece at its board square
+        self.piece_renderer.draw_board(
+            screen, self.logic.board, flipped=flipped, skip=dragging_piece
+        )
 
         # Draw the dragged piece following the mouse cursor, if any
         if dragging_piece is not None:
@@ -249,6 +388,193 @@ class GameState(State):
                 self.promotion_modal.color = color
                 self.promotion_modal.render()
 
+        if isinstance(self.session, OnlineChessSession):
+            self._render_clocks(screen, flipped)
+            self._render_connection_notice(screen)
+        else:
+            self._render_navigation(screen)
+
         if self.logic.game_over:
             self.game_over_notification.winner_color = self.logic.result[1]
             self.game_over_notification.render(screen)
+
+        if isinstance(self.session, OnlineChessSession):
+            if self.show_latency:
+                self._render_latency(screen)
+            self.session.note_rendered()
+
+    def is_active(self):
+        # Dragging needs every frame; so does the promotion modal, which waits on a click
+        return self.dragging or self.logic.pending_promotion is not None
+
+    def _premove_squares(self):
+        squares = [square for move in self.session.premoves for square in (move[:2], move[2:])]
+        if self.premove_origin is not None:
+            squares.append(self.premove_origin)
+        return squares
+
+    def _render_premoves(self, screen, flipped):
+        squares = self._premove_squares()
+        if squares:
+            self.board_renderer.draw_highlights(
+                screen, squares, flipped=flipped, color=settings.PREMOVE_HIGHLIGHT_COLOR
+            )
+
+    def _clock_texts(self, flipped):
+        """Both online clocks as text, the side at the top of the board first."""
+
+        if self.session.clock_remaining("white") is None:
+            return []
+
+        top_color, bottom_color = ("white", "black") if flipped else ("black", "white")
+        texts = []
+        for color in (top_color, bottom_color):
+            minutes, seconds = divmod(int(self.session.clock_remaining(color)), 60)
+            texts.append(f"{minutes:02d}:{seconds:02d}")
+        return texts
+
+    def _render_clocks(self, screen, flipped):
+        """Draw both online clocks in the sidebar, the side at the top of the board first."""
+
+        x = self.button_exit.rect.x
+        board_top = settings.START_GRID_BOARD_POS[1]
+        board_bottom = board_top + settings.TILESIZE * 8
+
+        for text, y in zip(
+            self._clock_texts(flipped),
+            (board_top + settings.TILESIZE * 2, board_bottom - settings.TILESIZE),
+        ):
+            text_surface = assets.text(text, 48, (240, 217, 181))
+            screen.blit(text_surface, (x, y))
+
+    def _connection_notice(self):
+        if self.session.connection_status == "reconnecting":
+            return "Reconnecting..."
+        if not self.session.opponent_connected:
+            return "Opponent disconnected"
+        return None
+
+    def _render_connection_notice(self, screen):
+        """Tell the player while either side of an online game is reconnecting."""
+
+        notice = self._connection_notice()
+        if notice is None:
+            return
+
+        text_surface = assets.text(notice, 32, (240, 217, 181))
+        x = self.button_exit.rect.x
+        y = settings.START_GRID_BOARD_POS[1] + settings.TILESIZE * 4
+        screen.blit(text_surface, (x, y))
+
+    def _latency_lines(self):
+        """The session's latency stats as text (last / mean / p95 in ms)."""
+
+        lines = []
+        for name, (last, mean, p95) in self.session.latency.summary().items():
+            if last is None:
+                lines.append(f"{name}: -")
+            else:
+                lines.append(f"{name}: {last:.1f} / {mean:.1f} / {p95:.1f} ms")
+        return lines
+
+    def _render_latency(self, screen):
+        """Small overlay with the session's latency stats."""
+
+        x = self.button_exit.rect.x
+        y = settings.START_GRID_BOARD_POS[1] + settings.TILESIZE * 5
+
+        for line in self._latency_lines():
+            text_surface = assets.text(line, 20, (240, 217, 181))
+            screen.blit(text_surface, (x, y))
+            y += text_surface.get_height()
+
+    def _current_frame(self, flipped) -> _Frame:
+        board = self.logic.board.board
+        position = tuple(piece for row in board for piece in row)
+
+        highlights = {(row, col, "valid") for row, col in self.logic.valid_moves}
+        highlights.update((row, col, "premove") for row, col in self._premove_squares())
+
+        drag = None
+        if self.dragging:
+            drag = (self.drag_piece, self.mouse_pos, self.drag_origin)
+
+        sidebar = (self._navigation_text(),)
+        if isinstance(self.session, OnlineChessSession):
+            sidebar += (*self._clock_texts(flipped), self._connection_notice())
+            if self.show_latency:
+                sidebar += tuple(self._latency_lines())
+
+        return _Frame(
+            position=position,
+            highlights=frozenset(highlights),
+            drag=drag,
+            button_hover=self.button_exit.is_hovering,
+            sidebar=sidebar,
+            overlays=(self.logic.game_over, self.logic.pending_promotion),
+        )
+
+    def _square_rect(self, row, col, flipped):
+        screen_row = 7 - row if flipped else row
+        screen_col = 7 - col if flipped else col
+        return pygame.Rect(
+            screen_col * settings.TILESIZE + settings.START_GRID_BOARD_POS[0],
+            screen_row * settings.TILESIZE + settings.START_GRID_BOARD_POS[1],
+            settings.TILESIZE,
+            settings.TILESIZE,
+        )
+
+    def dirty_rects(self):
+        """Squares whose piece or outline changed, the drag sprite's old and new
+        spots, the exit button on hover changes and the sidebar when its text
+        changed. Overlays (game over, promotion) repaint the whole screen."""
+
+        flipped = getattr(self.session, "local_color", None) == "black"
+        frame = self._current_frame(flipped)
+        previous = self._drawn_frame
+        self._drawn_frame = frame
+
+        if previous is None or frame.overlays != previous.overlays:
+            return None
+
+        squares = {
+            divmod(index, 8)
+            for index, (before, after) in enumerate(zip(previous.position, frame.position))
+            if before is not after
+        }
+        squares.update(
+            (row, col) for row, col, _ in previous.highlights ^ frame.highlights
+        )
+
+        rects = []
+        if frame.drag != previous.drag:
+            for drag in (previous.drag, frame.drag):
+                if drag is None:
+                    continue
+                _, mouse_pos, origin = drag
+                sprite = pygame.Rect(0, 0, settings.TILESIZE, settings.TILESIZE)
+                sprite.center = mouse_pos
+                rects.append(sprite)
+                # The dragged piece is hidden from (then shown again on) its square
+                squares.add(origin)
+
+        rects.extend(self._square_rect(row, col, flipped) for row, col in squares)
+
+        if frame.button_hover != previous.button_hover:
+            rects.append(self.button_exit.rect.copy())
+
+        if frame.sidebar != previous.sidebar:
+            x = self.button_exit.rect.x
+            y = self.button_exit.rect.bottom
+            rects.append(pygame.Rect(x, y, settings.WIDTH - x, settings.HEIGHT - y))
+
+        # The frame is redrawn clipped to the union of these rects, and pygame
+        # draws a rect's outline along the clip edge when the clip cuts through
+        # it: when the union reaches into the exit button, include it whole
+        if rects:
+            button = self.button_exit.rect
+            clip = rects[0].unionall(rects[1:])
+            if clip.colliderect(button) and not clip.contains(button):
+                rects.append(button.copy())
+
+        return rects
@@ -4,6 +4,7 @@ from src.core.state import State
 from src.ui.button_renderer import ButtonRenderer
 
 from src.utils import settings
+from src.utils.preloader import start_preloading
 
 
 class HomeState(State):
@@ -44,7 +45,8 @@ class HomeState(State):
         )
 
     def enter(self):
-        pass
+        # Decode sounds and scale sprites while the player is in the menu
+        start_preloading()
 
     def exit(self):
         pass
@@ -4,17 +4,21 @@ from src.core.state import State
 
 from src.states.game_state import GameState
 from src.utils import settings
+from src.utils.asset_manager import assets
 
 
 class WaitingForOpponentState(State):
     def __init__(self, manager):
         self.manager = manager
         self.session: OnlineChessSession | None = None
-        self.font = pygame.font.Font(None, 32)
         self._has_started_game = False
 
     def enter(self):
-        self.session = OnlineChessSession(settings.URI_SERVER_ONLINE_GAME)
+        self.session = OnlineChessSession(
+            settings.URI_SERVER_ONLINE_GAME,
+            rating=settings.ONLINE_RATING,
+            time_control=settings.ONLINE_TIME_CONTROL,
+        )
 
     def exit(self):
         pass
@@ -47,7 +51,7 @@ class WaitingForOpponentState(State):
             elif self.session.connection_status == "closed":
                 status_text = "Connection closed."
 
-        text_surface = self.font.render(status_text, True, (240, 217, 181))
+        text_surface = assets.text(status_text, 32, (240, 217, 181))
         text_rect = text_surface.get_rect(
             center=(settings.WIDTH // 2, settings.HEIGHT // 2)
         )
@@ -3,11 +3,37 @@ from src.chess.board import Board
 from src.utils import settings
 
 
+# Thickness of the outline drawn around highlighted squares (pixels)
+HIGHLIGHT_WIDTH = 4
+
+
 class BoardRenderer:
     def __init__(self, board: Board):
         self.board = board
 
-    def draw(self, screen: pygame.Surface, flipped: bool = False):
+        # Pre-rendered board squares, keyed by orientation
+        self._board_surfaces: dict[bool, pygame.Surface] = {}
+        # Pre-rendered square outlines, keyed by color
+        self._highlight_surfaces: dict[tuple[int, int, int], pygame.Surface] = {}
+        # (TILESIZE, light, dark) the cached surfaces were rendered for
+        self._cache_key = None
+
+    def _check_cache(self) -> None:
+        """Drop the cached surfaces if the tile size or theme changed since they were built."""
+
+        key = (settings.TILESIZE, settings.BOARD_LIGHT_COLOR, settings.BOARD_DARK_COLOR)
+        if key != self._cache_key:
+            self._board_surfaces.clear()
+            self._highlight_surfaces.clear()
+            self._cache_key = key
+
+    def _board_surface(self, flipped: bool) -> pygame.Surface:
+        surface = self._board_surfaces.get(flipped)
+        if surface is not None:
+            return surface
+
+        size = settings.TILESIZE * 8
+        surface = pygame.Surface((size, size)).convert()
         for row in range(8):
             for col in range(8):
                 # Map board coordinates to screen coordinates depending on orientation
@@ -20,23 +46,53 @@ class BoardRenderer:
                     else settings.BOARD_DARK_COLOR
                 )
                 rect = pygame.Rect(
-                    screen_col * settings.TILESIZE + settings.START_GRID_BOARD_POS[0],
-                    screen_row * settings.TILESIZE + settings.START_GRID_BOARD_POS[1],
+                    screen_col * settings.TILESIZE,
+                    screen_row * settings.TILESIZE,
                     settings.TILESIZE,
                     settings.TILESIZE,
                 )
-                pygame.draw.rect(screen, color, rect)
+                pygame.draw.rect(surface, color, rect)
+
+        self._board_surfaces[flipped] = surface
+        return surface
+
+    def _highlight_surface(self, color) -> pygame.Surface:
+        color = tuple(color)
+        surface = self._highlight_surfaces.get(color)
+        if surface is not None:
+            return surface
+
+        surface = pygame.Surface(
+            (settings.TILESIZE, settings.TILESIZE), pygame.SRCALPHA
+        ).convert_alpha()
+        pygame.draw.rect(surface, color, surface.get_rect(), HIGHLIGHT_WIDTH)
+
+        self._highlight_surfaces[color] = surface
+        return surface
+
+    def draw(self, screen: pygame.Surface, flipped: bool = False):
+        self._check_cache()
+        screen.blit(self._board_surface(flipped), settings.START_GRID_BOARD_POS)
+
+    def draw_highlights(
+        self, screen: pygame.Surface, moves, flipped: bool = False, color=(0, 255, 0)
+    ):
+        if not moves:
+            return
+
+        self._check_cache()
+        outline = self._highlight_surface(color)
+        board_x, board_y = settings.START_GRID_BOARD_POS
 
-    def draw_highlights(self, screen: pygame.Surface, moves, flipped: bool = False):
         for row, col in moves:
             # Map board coordinates of highlighted squares to screen coordinates
             screen_row = 7 - row if flipped else row
             screen_col = 7 - col if flipped else col
 
-            rect = pygame.Rect(
-                screen_col * settings.TILESIZE + settings.START_GRID_BOARD_POS[0],
-                screen_row * settings.TILESIZE + settings.START_GRID_BOARD_POS[1],
-                settings.TILESIZE,
-                settings.TILESIZE,
+            screen.blit(
+                outline,
+                (
+                    screen_col * settings.TILESIZE + board_x,
+                    screen_row * settings.TILESIZE + board_y,
+                ),
             )
-            pygame.draw.rect(screen, (0, 255, 0), rect, 4)
@@ -1,5 +1,7 @@
 import pygame
 
+from src.utils.asset_manager import assets
+
 
 class ButtonRenderer:
     def __init__(self, pos: tuple[int, int], size: tuple[int, int], text: str):
@@ -25,8 +27,8 @@ class ButtonRenderer:
         # State
         self.is_hovering = False
         
-        # Font
-        self.font = pygame.font.Font(None, 24)
+        # Font size (fonts and rendered labels come from the shared asset cache)
+        self.font_size = 24
     
     def update(self, mouse_pos: tuple[int, int]) -> None:
         """Update button state based on mouse position."""
@@ -46,6 +48,6 @@ class ButtonRenderer:
         pygame.draw.rect(screen, self.border_color, self.rect, 2)
         
         # Draw text
-        text_surface = self.font.render(self.text, True, self.text_color)
+        text_surface = assets.text(self.text, self.font_size, self.text_color)
         text_rect = text_surface.get_rect(center=self.rect.center)
         screen.blit(text_surface, text_rect)
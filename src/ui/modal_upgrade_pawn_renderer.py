@@ -1,5 +1,6 @@
 import pygame
 from src.utils import settings
+from src.utils.asset_manager import assets
 
 
 
@@ -38,12 +39,12 @@ class ModalUpgradePawnRenderer:
 
     def render(self):
         # Slightly darker overlay over the whole screen
-        overlay = pygame.Surface((settings.WIDTH, settings.HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 170))
+        overlay = assets.overlay((settings.WIDTH, settings.HEIGHT), (0, 0, 0, 170))
         self.screen.blit(overlay, (0, 0))
 
         # Default to white pieces if color not set (should be overwritten by GameState)
         color = self.color or "white"
+        sprites = assets.piece_sprites(self.cell_size)
 
         for row in range(self.grid_rows):
             for col in range(self.grid_cols):
@@ -65,14 +66,7 @@ class ModalUpgradePawnRenderer:
                 pygame.draw.rect(self.screen, bg_color, cell_rect)
 
                 # Draw piece option icon (queen, rook, bishop, knight)
-                kind = self.options_grid[row][col]
-                prefix = settings.PIECES_COLOR[color]
-                img_path = settings.PIECES_PATH / f"{prefix}{kind.title()}.png"
-
-                img = pygame.image.load(img_path).convert_alpha()
-                img = pygame.transform.smoothscale(
-                    img, (self.cell_size, self.cell_size)
-                )
+                img = sprites[(color, self.options_grid[row][col])]
                 self.screen.blit(img, img.get_rect(center=cell_rect.center))
 
     def handle_click(self, x: int, y: int):
@@ -1,5 +1,7 @@
 import pygame
 
+from src.utils.asset_manager import assets
+
 
 class NumericInputRenderer:
     def __init__(self, pos, size, placeholder="", min_value=400, max_value=3000):
@@ -19,7 +21,7 @@ class NumericInputRenderer:
         self.is_active = False
         self.input_field = ""
 
-        self.font = pygame.font.Font(None, 24)
+        self.font_size = 24
 
     def is_clicked(self, mouse_pos):
         clicked = self.rect.collidepoint(mouse_pos)
@@ -61,9 +63,9 @@ class NumericInputRenderer:
         pygame.draw.rect(screen, self.border_color, self.rect, 2)
 
         # Draw text
-        text_surface = self.font.render(
+        text_surface = assets.text(
             self.input_field if self.input_field else self.placeholder,
-            True,
+            self.font_size,
             self.text_color if self.input_field else self.placeholder_color,
         )
         text_rect = text_surface.get_rect(center=self.rect.center)
@@ -1,41 +1,52 @@
 import pygame
 from src.chess.pieces.piece import Piece
 from src.utils import settings
-from src.utils.image_cache import ImageCache
+from src.utils.asset_manager import assets
 
 
 class PieceRenderer:
-    def __init__(self):
-        self.img = None
-        self.image_cache = ImageCache()
+    """Draws pieces from the shared sprite atlas at the current tile size.
 
-    def draw(self, screen: pygame.Surface, piece: Piece, flipped: bool = False):
-        row, col = piece.position
+    The atlas (see AssetManager.piece_sprites) is a single surface holding
+    all 12 pieces; each sprite is a subsurface of it, looked up directly by
+    (color, kind).
+    """
 
+    def sprite(self, color: str, kind: str) -> pygame.Surface:
+        return assets.piece_sprites(settings.TILESIZE)[(color, kind)]
+
+    def _square_topleft(self, row: int, col: int, flipped: bool) -> tuple[int, int]:
         # Map board coordinates to screen coordinates depending on orientation
         screen_row = 7 - row if flipped else row
         screen_col = 7 - col if flipped else col
 
-        center = (
-            screen_col * settings.TILESIZE
-            + settings.TILESIZE // 2
-            + settings.START_GRID_BOARD_POS[0],
-            screen_row * settings.TILESIZE
-            + settings.TILESIZE // 2
-            + settings.START_GRID_BOARD_POS[1],
+        return (
+            screen_col * settings.TILESIZE + settings.START_GRID_BOARD_POS[0],
+            screen_row * settings.TILESIZE + settings.START_GRID_BOARD_POS[1],
         )
 
-        self.img = self.image_cache.get(
-            f"{settings.PIECES_PATH / settings.PIECES_COLOR[piece.color]}{piece.kind.title()}.png",
-            (settings.TILESIZE, settings.TILESIZE),
+    def draw(self, screen: pygame.Surface, piece: Piece, flipped: bool = False):
+        row, col = piece.position
+        screen.blit(
+            self.sprite(piece.color, piece.kind), self._square_topleft(row, col, flipped)
         )
-        screen.blit(self.img, self.img.get_rect(center=center))
+
+    def draw_board(self, screen: pygame.Surface, board, flipped: bool = False, skip=None):
+        """Draw every piece of `board` (except `skip`, e.g. a dragged piece) in one blits() call."""
+
+        sprites = assets.piece_sprites(settings.TILESIZE)
+        batch = []
+        for row, pieces in enumerate(board.board):
+            for col, piece in enumerate(pieces):
+                if piece is None or piece is skip:
+                    continue
+                batch.append(
+                    (sprites[(piece.color, piece.kind)], self._square_topleft(row, col, flipped))
+                )
+        screen.blits(batch, doreturn=False)
 
     def draw_at(self, screen: pygame.Surface, piece: Piece, center: tuple[int, int]):
         """Draw the given piece centered at an arbitrary pixel position (used for drag-and-drop)."""
 
-        self.img = self.image_cache.get(
-            f"{settings.PIECES_PATH / settings.PIECES_COLOR[piece.color]}{piece.kind.title()}.png",
-            (settings.TILESIZE, settings.TILESIZE),
-        )
-        screen.blit(self.img, self.img.get_rect(center=center))
+        image = self.sprite(piece.color, piece.kind)
+        screen.blit(image, image.get_rect(center=center))
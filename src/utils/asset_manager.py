@@ -0,0 +1,192 @@
+from collections import OrderedDict
+import threading
+
+import pygame
+
+from src.utils import settings, sprite_cache
+
+
+PIECE_COLORS = ("white", "black")
+PIECE_KINDS = ("pawn", "knight", "bishop", "rook", "queen", "king")
+
+
+def piece_image_path(color: str, kind: str):
+    """Source PNG of a piece, e.g. assets/images/pieces/white/w_Queen.png."""
+
+    return settings.PIECES_PATH / f"{settings.PIECES_COLOR[color]}{kind.title()}.png"
+
+
+def surface_bytes(surface: pygame.Surface) -> int:
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+class AssetManager:
+    """Process-wide cache of the surfaces UI renderers draw with.
+
+    Scaled images, piece atlases, translucent overlays and rendered text
+    are created once and shared by every renderer; fonts are loaded once
+    per size. Entries are kept in LRU order and the least recently used
+    ones are evicted once their pixel data exceeds `max_bytes`; `stats()`
+    reports the current use.
+    """
+
+    def __init__(self, max_bytes: int = settings.ASSET_CACHE_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        # key -> (value, size in bytes)
+        self._entries: OrderedDict = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # (name, size) -> Font; a handful of entries, never evicted
+        self._fonts: dict = {}
+        # tile -> unconverted piece atlas scaled by the preloader thread
+        self._prepared_atlases: dict[int, pygame.Surface] = {}
+        self._prepare_lock = threading.Lock()
+
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def _put(self, key, value, size: int):
+        self._entries[key] = (value, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+    def image(self, path, size: tuple[int, int] | None = None) -> pygame.Surface:
+        """An image file, converted for fast blitting and optionally scaled."""
+
+        key = ("image", str(path), size)
+        image = self._get(key)
+        if image is not None:
+            return image
+
+        image = pygame.image.load(path).convert_alpha()
+        if size:
+            image = pygame.transform.smoothscale(image, size)
+        return self._put(key, image, surface_bytes(image))
+
+    def overlay(self, size: tuple[int, int], rgba: tuple[int, int, int, int]) -> pygame.Surface:
+        """A translucent surface of one color (modal and game-over backdrops)."""
+
+        key = ("overlay", size, rgba)
+        overlay = self._get(key)
+        if overlay is not None:
+            return overlay
+
+        overlay = pygame.Surface(size, pygame.SRCALPHA)
+        overlay.fill(rgba)
+        return self._put(key, overlay, surface_bytes(overlay))
+
+    def piece_sprites(self, tile: int) -> dict[tuple[str, str], pygame.Surface]:
+        """All 12 pieces at `tile` pixels, as subsurfaces of one atlas surface.
+
+        The atlas has one row per color and one column per kind.
+        """
+
+        key = ("pieces", tile)
+        sprites = self._get(key)
+        if sprites is not None:
+            return sprites
+
+        # Usually already scaled by the preloader; if it is still at it, this waits for it
+        self.prepare_piece_sprites(tile)
+        atlas = self._prepared_atlases.pop(tile).convert_alpha()
+
+        sprites = {}
+        for row, color in enumerate(PIECE_COLORS):
+            for col, kind in enumerate(PIECE_KINDS):
+                rect = pygame.Rect(col * tile, row * tile, tile, tile)
+                sprites[(color, kind)] = atlas.subsurface(rect)
+
+        return self._put(key, sprites, surface_bytes(atlas))
+
+    def prepare_piece_sprites(self, tile: int) -> None:
+        """Load and scale the piece images into an atlas for `tile`.
+
+        The atlas is read from the on-disk sprite cache when it was built for
+        the same tile size and source files, and written there otherwise.
+        Does not touch the display, so it can run on the preloader thread;
+        piece_sprites() converts the result on first use.
+        """
+
+        with self._prepare_lock:
+            if tile in self._prepared_atlases or ("pieces", tile) in self._entries:
+                return
+
+            size = (tile * len(PIECE_KINDS), tile * len(PIECE_COLORS))
+            sources = [
+                piece_image_path(color, kind) for color in PIECE_COLORS for kind in PIECE_KINDS
+            ]
+            atlas = sprite_cache.load_atlas(tile, size, sources)
+            if atlas is None:
+                atlas = pygame.Surface(size, pygame.SRCALPHA)
+                for row, color in enumerate(PIECE_COLORS):
+                    for col, kind in enumerate(PIECE_KINDS):
+                        # Sources are only needed to build the atlas: not cached on their own
+                        image = pygame.image.load(piece_image_path(color, kind))
+                        image = pygame.transform.smoothscale(image, (tile, tile))
+                        atlas.blit(image, (col * tile, row * tile))
+                sprite_cache.save_atlas(tile, atlas, sources)
+
+            self._prepared_atlases[tile] = atlas
+
+    def font(self, size: int, name: str | None = None) -> pygame.font.Font:
+        """The font `name` (None: pygame's default font) at `size`, loaded once."""
+
+        font = self._fonts.get((name, size))
+        if font is None:
+            font = self._fonts[(name, size)] = pygame.font.Font(name, size)
+        return font
+
+    def text(
+        self,
+        text: str,
+        size: int,
+        color,
+        antialias: bool = True,
+        name: str | None = None,
+    ) -> pygame.Surface:
+        """`text` rendered with font(size, name), cached until evicted (LRU)."""
+
+        key = ("text", name, size, text, tuple(color), antialias)
+        surface = self._get(key)
+        if surface is not None:
+            return surface
+
+        surface = self.font(size, name).render(text, antialias, color)
+        return self._put(key, surface, surface_bytes(surface))
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def report(self) -> str:
+        return (
+            f"assets: {len(self._entries)} entries, {self.bytes / 1024:.0f} KiB"
+            f" of {self.max_bytes / 1024:.0f} KiB, {self.hits} hits,"
+            f" {self.misses} misses, {self.evictions} evictions"
+        )
+
+
+# Shared by every renderer
+assets = AssetManager()
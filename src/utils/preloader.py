@@ -0,0 +1,35 @@
+import threading
+import time
+
+from src.utils import settings
+from src.utils.asset_manager import assets
+from src.utils.sound_bank import sounds
+from src.utils.startup_profile import startup_profile
+
+
+_thread: threading.Thread | None = None
+
+
+def _preload() -> None:
+    started = time.perf_counter()
+    try:
+        sounds.load()
+        assets.prepare_piece_sprites(settings.TILESIZE)
+    finally:
+        startup_profile.background_finished("asset preload", time.perf_counter() - started)
+
+
+def start_preloading() -> None:
+    """Decode sounds and scale piece images on a background thread (once).
+
+    Started from the home menu, so by the time a game starts its assets
+    are ready and GameState never blocks on disk I/O or decoding.
+    """
+
+    global _thread
+
+    if _thread is not None:
+        return
+    startup_profile.background_started("asset preload")
+    _thread = threading.Thread(target=_preload, daemon=True)
+    _thread.start()
@@ -14,6 +14,21 @@ TILESIZE = BASE_TILESIZE
 WIDTH = TILESIZE * GRID_SIZE + BASE_SIDEBAR_WIDTH
 HEIGHT = TILESIZE * GRID_SIZE + BASE_SIDEBAR_HEIGHT
 FPS = 60
+# Frame rate while nothing moves on screen; input, network and AI events still
+# wake the game loop immediately
+IDLE_FPS = 5
+# Print average frame time and CPU use (active vs idle) every 10 s and on exit
+LOG_FRAME_STATS = False
+# Redraw and push only the screen regions that changed (states report them)
+DIRTY_RECT_RENDERING = True
+# Time from launch to the first menu frame the client should stay under (ms);
+# CHESS_PROFILE_STARTUP=1 prints the breakdown and flags runs over budget
+STARTUP_BUDGET_MS = 250
+# Instrument the game loop: per-frame handle_event / update / render times and
+# rules-engine call counts, overlay toggled with F4, F5 records a cProfile of the
+# next FRAME_PROFILE_FRAMES frames into PROFILES_PATH. Off: no instrumentation at all
+FRAME_PROFILER = False
+FRAME_PROFILE_FRAMES = 120
 
 START_GRID_BOARD_POS = BASE_START_GRID_BOARD_POS
 
@@ -22,20 +37,50 @@ BACKGROUND_COLOR_RGB = (48, 46, 43)
 # Board theme colors
 BOARD_LIGHT_COLOR = (240, 217, 181)
 BOARD_DARK_COLOR = (181, 136, 99)
+# Outline of the squares of queued premoves
+PREMOVE_HIGHLIGHT_COLOR = (220, 60, 60)
 
 ASSETS_PATH = Path(__file__).parent.parent.parent / "assets"
 PIECES_PATH = ASSETS_PATH / "images" / "pieces"
+# Pixel data the shared asset cache may hold before evicting (bytes)
+ASSET_CACHE_MAX_BYTES = 32 * 1024 * 1024
+# Keep the piece atlas scaled for the current tile size on disk (raw RGBA,
+# memory-mapped at startup); rebuilt when the tile size or a source image changes
+SPRITE_DISK_CACHE = True
+SPRITE_CACHE_PATH = ASSETS_PATH.parent / "data" / "piece_sprites.cache"
+PROFILES_PATH = ASSETS_PATH.parent / "data" / "profiles"
 SOUNDS_PATH = ASSETS_PATH / "sounds"
+# Game sounds by name, decoded once into the shared sound bank
+SOUND_FILES = {
+    "entry": "notify.mp3",
+    "move": "move-self.mp3",
+    "capture": "capture.mp3",
+    "check": "move-check.mp3",
+    "checkmate": "checkmate.mp3",
+    "castling": "castle.mp3",
+}
 
+# Sprite file prefix per color, relative to PIECES_PATH ("/" works on every OS)
 PIECES_COLOR = {
-    "white": "white\\w_",
-    "black": "black\\b_",
+    "white": "white/w_",
+    "black": "black/b_",
 }
 
 STOCKFISH_EXECUTOR = "stockfish-windows-x86-64.exe"
 STOCKFISH_PATH = ASSETS_PATH / "engines" / "stockfish" / STOCKFISH_EXECUTOR
 
 URI_SERVER_ONLINE_GAME = "ws://localhost:8000/ws"
+# Matchmaking preferences sent to the server: players are paired within the
+# same time control (base seconds, increment seconds) and by closest rating
+ONLINE_RATING = 1500
+ONLINE_TIME_CONTROL = (300, 3)
+# Posted by the network thread whenever a server message arrives, so the main
+# loop wakes up from pygame.event.wait() and applies it right away
+NETWORK_MESSAGE_EVENT = pygame.USEREVENT + 1
+# Posted by the AI thread when the engine has picked its move
+AI_MOVE_EVENT = pygame.USEREVENT + 2
+# Show RTT / relay / render latencies under the board in online games (F3 toggles)
+SHOW_LATENCY_OVERLAY = False
 
 
 def initialize_display_settings():
@@ -0,0 +1,40 @@
+import pygame
+
+from src.utils import settings
+
+
+class SoundBank:
+    """Process-wide decoded game sounds, shared by every game.
+
+    `load()` decodes every file in settings.SOUND_FILES (it runs on the
+    preloader thread). Until it is done `play()` is silent rather than
+    decoding on the spot, so starting a game never waits on the disk.
+    """
+
+    def __init__(self) -> None:
+        self._sounds: dict[str, pygame.mixer.Sound] = {}
+        # Set once every sound was decoded (or failed to)
+        self._loaded = False
+
+    def load(self) -> None:
+        if self._loaded:
+            return
+
+        sounds = {}
+        for name, filename in settings.SOUND_FILES.items():
+            try:
+                sounds[name] = pygame.mixer.Sound(str(settings.SOUNDS_PATH / filename))
+            except pygame.error:
+                # No audio device (or unreadable file): that sound stays silent
+                continue
+
+        self._sounds = sounds
+        self._loaded = True
+
+    def play(self, name: str) -> None:
+        sound = self._sounds.get(name)
+        if sound is not None:
+            sound.play()
+
+
+sounds = SoundBank()
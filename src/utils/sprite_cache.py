@@ -0,0 +1,88 @@
+import json
+import mmap
+import os
+import struct
+
+import pygame
+
+from src.utils import settings
+
+
+# File layout: MAGIC, header length (uint32 LE), JSON header, raw RGBA pixels
+MAGIC = b"CHSPRITE"
+VERSION = 1
+_LENGTH = struct.Struct("<I")
+
+
+def _signature(tile: int, size: tuple[int, int], sources) -> dict:
+    """What a cached atlas depends on: tile size, atlas size and every source file."""
+
+    return {
+        "version": VERSION,
+        "tile": tile,
+        "size": list(size),
+        "sources": [
+            [str(path), os.stat(path).st_mtime_ns, os.stat(path).st_size] for path in sources
+        ],
+    }
+
+
+def load_atlas(tile: int, size: tuple[int, int], sources) -> pygame.Surface | None:
+    """The cached atlas for `tile`, or None if missing or built from other sources.
+
+    The file is memory-mapped and the surface reads its pixels straight from
+    the mapping; convert it before blitting.
+    """
+
+    if not settings.SPRITE_DISK_CACHE:
+        return None
+
+    try:
+        signature = _signature(tile, size, sources)
+        with open(settings.SPRITE_CACHE_PATH, "rb") as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # No cache yet (or an empty file, which mmap refuses)
+        return None
+
+    start = len(MAGIC) + _LENGTH.size
+    if data[: len(MAGIC)] != MAGIC:
+        return None
+    (header_length,) = _LENGTH.unpack_from(data, len(MAGIC))
+    try:
+        header = json.loads(data[start : start + header_length])
+    except ValueError:
+        return None
+    if header != signature:
+        return None
+
+    pixels = memoryview(data)[start + header_length :]
+    if len(pixels) != size[0] * size[1] * 4:
+        return None
+    return pygame.image.frombuffer(pixels, size, "RGBA")
+
+
+def save_atlas(tile: int, atlas: pygame.Surface, sources) -> None:
+    """Write `atlas` as the cached atlas, replacing the previous one.
+
+    Failing to write (read-only install, full disk) only costs the next
+    launch the scaling work, so errors are ignored.
+    """
+
+    if not settings.SPRITE_DISK_CACHE:
+        return
+
+    path = settings.SPRITE_CACHE_PATH
+    temp_path = path.with_suffix(".tmp")
+    try:
+        header = json.dumps(_signature(tile, atlas.get_size(), sources)).encode()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(temp_path, "wb") as file:
+            file.write(MAGIC)
+            file.write(_LENGTH.pack(len(header)))
+            file.write(header)
+            file.write(pygame.image.tobytes(atlas, "RGBA"))
+        # Readers never see a half-written file
+        os.replace(temp_path, path)
+    except OSError:
+        pass
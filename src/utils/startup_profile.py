@@ -0,0 +1,89 @@
+import os
+import sys
+import threading
+import time
+
+
+# Set this environment variable (to anything but "" or "0") to print the startup breakdown
+PROFILE_ENV_VAR = "CHESS_PROFILE_STARTUP"
+
+
+class StartupProfile:
+    """Wall time of each client startup phase, up to the first menu frame.
+
+    `mark(name)` closes a phase on the main thread (imports, display init,
+    first frame...). Work started in the background (the asset preloader)
+    is reported with `background_started` / `background_finished`. The
+    breakdown is printed once the menu is on screen and background work is
+    done, if profiling is enabled. Times count from when this module was
+    first imported, which src/main.py does before anything else.
+    """
+
+    def __init__(self, enabled: bool) -> None:
+        self.enabled = enabled
+        self.started_at = time.perf_counter()
+        self._last_mark = self.started_at
+        self._last_modules = len(sys.modules)
+        # (phase, milliseconds, modules imported during it)
+        self.phases: list[tuple[str, float, int]] = []
+        # name -> milliseconds, None while still running
+        self.background: dict[str, float | None] = {}
+        self.time_to_menu_ms: float | None = None
+        self.budget_ms: float | None = None
+        self._printed = False
+        self._lock = threading.Lock()
+
+    def mark(self, phase: str) -> None:
+        now = time.perf_counter()
+        modules = len(sys.modules)
+        self.phases.append(
+            (phase, (now - self._last_mark) * 1000, modules - self._last_modules)
+        )
+        self._last_mark = now
+        self._last_modules = modules
+
+    def menu_ready(self, budget_ms: float) -> None:
+        """Close the last phase: the first menu frame is on screen."""
+
+        if self.time_to_menu_ms is not None:
+            return
+        self.mark("first menu frame")
+        self.time_to_menu_ms = (self._last_mark - self.started_at) * 1000
+        self.budget_ms = budget_ms
+        self._print_when_done()
+
+    def background_started(self, name: str) -> None:
+        with self._lock:
+            self.background[name] = None
+
+    def background_finished(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.background[name] = seconds * 1000
+        self._print_when_done()
+
+    def _print_when_done(self) -> None:
+        with self._lock:
+            if (
+                not self.enabled
+                or self._printed
+                or self.time_to_menu_ms is None
+                or None in self.background.values()
+            ):
+                return
+            self._printed = True
+        print(self.format())
+
+    def format(self) -> str:
+        header = f"startup: {self.time_to_menu_ms:.1f} ms to menu (budget {self.budget_ms:.0f} ms)"
+        if self.time_to_menu_ms > self.budget_ms:
+            header += " - OVER BUDGET"
+        lines = [header]
+        for phase, ms, modules in self.phases:
+            imported = f"  +{modules} modules" if modules else ""
+            lines.append(f"  {phase:<28} {ms:8.1f} ms{imported}")
+        for name, ms in self.background.items():
+            lines.append(f"  {name + ' (background)':<28} {ms:8.1f} ms")
+        return "\n".join(lines)
+
+
+startup_profile = StartupProfile(os.environ.get(PROFILE_ENV_VAR, "") not in ("", "0"))
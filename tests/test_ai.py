@@ -0,0 +1,18 @@
+import pytest
+
+pytest.importorskip("stockfish")
+
+from src.chess.ai import _uci_promotion, _uci_to_coords  # noqa: E402
+
+
+def test_uci_move_without_promotion():
+    assert _uci_to_coords("e2e4") == ((6, 4), (4, 4))
+    assert _uci_promotion("e2e4") is None
+
+
+@pytest.mark.parametrize(
+    "move, kind",
+    [("e7e8q", "queen"), ("a2a1r", "rook"), ("g7h8b", "bishop"), ("b2a1n", "knight")],
+)
+def test_uci_promotion_suffix(move, kind):
+    assert _uci_promotion(move) == kind
@@ -0,0 +1,37 @@
+import sqlite3
+import time
+
+import pytest
+
+from src.server.archive import GameArchive, GameRecord
+
+
+def _record(room_id: str) -> GameRecord:
+    now = time.time()
+    return GameRecord(room_id, "a", "b", 1500, 1500, 60.0, 0.0, now, now, "1-0", "mate", b"")
+
+
+def test_stop_flushes_the_queued_games(tmp_path):
+    archive = GameArchive(tmp_path / "games.sqlite3", flush_interval=60.0)
+    archive.start()
+    for index in range(3):
+        archive.submit(_record(f"room-{index}"))
+    archive.stop()
+
+    with sqlite3.connect(tmp_path / "games.sqlite3") as db:
+        assert db.execute("SELECT COUNT(*) FROM games").fetchone() == (3,)
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_stop_returns_when_the_writer_died_with_a_full_queue(tmp_path):
+    # A directory cannot be opened as a database: the writer thread dies at once
+    archive = GameArchive(tmp_path, max_queue=2)
+    archive.start()
+    archive._thread.join(5)
+    assert not archive._thread.is_alive()
+    for index in range(3):
+        archive.submit(_record(f"room-{index}"))
+
+    started = time.monotonic()
+    archive.stop(timeout=0.5)
+    assert time.monotonic() - started < 0.5
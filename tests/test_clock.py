@@ -0,0 +1,103 @@
+import pytest
+
+from src.server.clock import GameClock, TimingWheel
+
+
+def _wheel(now: float = 0.0) -> TimingWheel:
+    return TimingWheel(now, tick=0.1, slots=16)
+
+
+def test_deadline_several_laps_out_expires_on_its_own_lap():
+    wheel = _wheel()
+    # 16 slots of 0.1 s: 5.05 s is more than three laps away
+    wheel.schedule("room", 5.05)
+
+    for lap_end in (1.6, 3.2, 4.8):
+        assert wheel.advance(lap_end) == []
+        assert len(wheel) == 1
+    assert wheel.advance(5.0) == []
+    assert wheel.advance(5.15) == ["room"]
+    assert len(wheel) == 0
+
+
+def test_a_long_jump_still_expires_everything_due():
+    wheel = _wheel()
+    wheel.schedule("soon", 0.35)
+    wheel.schedule("later", 9.0)
+
+    # The loop stalled for longer than a whole lap
+    assert wheel.advance(2.5) == ["soon"]
+    assert wheel.advance(9.0) == ["later"]
+
+
+def test_entries_sharing_a_slot_expire_on_their_own_lap():
+    wheel = _wheel()
+    wheel.schedule("first", 0.5)
+    # Same slot one lap later
+    wheel.schedule("second", 2.1)
+
+    assert wheel.advance(0.5) == ["first"]
+    assert wheel.advance(2.0) == []
+    assert wheel.advance(2.1) == ["second"]
+
+
+def test_reschedule_and_cancel():
+    wheel = _wheel()
+    wheel.schedule("room", 0.5)
+    # A move pushed the deadline back
+    wheel.schedule("room", 3.0)
+    assert len(wheel) == 1
+    assert wheel.advance(1.0) == []
+    assert wheel.advance(3.0) == ["room"]
+
+    wheel.schedule("room", 4.0)
+    wheel.cancel("room")
+    wheel.cancel("room")
+    assert wheel.advance(10.0) == []
+
+
+def test_past_deadline_expires_on_the_next_tick():
+    wheel = _wheel(now=5.0)
+    wheel.schedule("room", 1.0)
+    assert wheel.advance(5.15) == ["room"]
+
+
+def test_press_charges_the_mover_and_adds_the_increment():
+    clock = GameClock(60.0, 2.0)
+    # White's first move does not use White's time: it starts the clock
+    clock.press("white", 100.0)
+    assert clock.remaining["white"] == 62.0
+    assert clock.turn == "black" and clock.deadline() == 160.0
+
+    clock.press("black", 110.0)
+    assert clock.remaining["black"] == 52.0
+    # White's 62 s start counting down from Black's move
+    assert clock.deadline() == 110.0 + 62.0
+
+
+def test_stop_freezes_both_times():
+    clock = GameClock(60.0, 0.0)
+    clock.press("white", 0.0)
+    clock.stop(15.0)
+
+    assert not clock.running and clock.deadline() is None
+    assert clock.remaining_for("black", 100.0) == 45.0
+    assert clock.remaining_for("white", 100.0) == 60.0
+    # Stopping twice charges nothing more
+    clock.stop(30.0)
+    assert clock.remaining["black"] == 45.0
+
+
+def test_flag_zeroes_the_side_to_move():
+    clock = GameClock(1.0, 0.0)
+    clock.press("white", 0.0)
+    assert clock.flag() == "black"
+    assert clock.snapshot(5.0) == {"white": 1000, "black": 0, "turn": "black", "running": False}
+
+
+@pytest.mark.parametrize("slots", [1, 2, 4096])
+def test_any_wheel_size_expires_on_time(slots):
+    wheel = TimingWheel(0.0, tick=0.1, slots=slots)
+    wheel.schedule("room", 12.34)
+    assert wheel.advance(12.3) == []
+    assert wheel.advance(12.4) == ["room"]
@@ -0,0 +1,319 @@
+import random
+
+from src.chess.fen import board_to_fen
+from src.chess.game_logic import GameLogic
+from src.chess.pieces.king import King
+from src.chess.pieces.pawn import Pawn
+from src.chess.pieces.rook import Rook
+
+
+def _square(name: str) -> tuple[int, int]:
+    """Board (row, col) of an algebraic square, e.g. "e2" -> (6, 4)."""
+
+    return 8 - int(name[1]), ord(name[0]) - ord("a")
+
+
+def _play(logic: GameLogic, moves: str) -> None:
+    for move in moves.split():
+        promotion = {"q": "queen", "r": "rook", "b": "bishop", "n": "knight"}.get(move[4:])
+        result = logic.apply_move(_square(move[:2]), _square(move[2:4]), promotion)
+        assert result is not None, f"illegal move {move}"
+
+
+def _state(logic: GameLogic) -> tuple:
+    """Everything a position depends on, comparable across undo/redo."""
+
+    pieces = tuple(
+        None if piece is None else (piece.color, piece.kind, piece.has_moved, piece.position)
+        for row in logic.board.board
+        for piece in row
+    )
+    last_move = None
+    if logic.last_move is not None:
+        piece, *squares = logic.last_move
+        last_move = (piece.color, piece.kind, *squares)
+    return (
+        pieces,
+        board_to_fen(logic.board, logic.current_turn),
+        logic.current_turn,
+        logic.halfmove_clock,
+        last_move,
+        logic.last_move_was_capture,
+        logic.last_move_was_castling,
+        logic.game_over,
+        logic.result,
+        logic.move_stack.repetitions(logic.halfmove_clock),
+        # Covers castling rights and the en passant square as the rules see them
+        logic.all_legal_moves(),
+    )
+
+
+def test_undo_redo_castling_restores_the_rights():
+    logic = GameLogic()
+    _play(logic, "e2e4 e7e5 g1f3 b8c6 f1c4 g8f6")
+    before = _state(logic)
+
+    _play(logic, "e1g1")
+    after = _state(logic)
+    assert logic.board.get_piece(*_square("f1")).kind == "rook"
+
+    assert logic.undo()
+    assert _state(logic) == before
+    king = logic.board.get_piece(*_square("e1"))
+    rook = logic.board.get_piece(*_square("h1"))
+    assert not king.has_moved and not rook.has_moved
+    assert _square("g1") in logic.legal_moves_for(king)
+
+    assert logic.redo()
+    assert _state(logic) == after
+
+
+def test_undo_of_a_rook_move_gives_castling_back():
+    logic = GameLogic()
+    _play(logic, "g2g3 a7a6 g1f3 a6a5 f1g2 a5a4")
+    before = _state(logic)
+
+    _play(logic, "h1g1 b7b6 g1h1 b6b5")
+    assert "K" not in board_to_fen(logic.board, logic.current_turn).split()[2]
+
+    logic.go_to_ply(6)
+    assert _state(logic) == before
+    assert "K" in board_to_fen(logic.board, logic.current_turn).split()[2]
+
+
+def test_undo_redo_en_passant():
+    logic = GameLogic()
+    _play(logic, "e2e4 a7a6 e4e5 d7d5")
+    before = _state(logic)
+    assert _square("d6") in logic.legal_moves_for(logic.board.get_piece(*_square("e5")))
+
+    _play(logic, "e5d6")
+    after = _state(logic)
+    assert logic.board.get_piece(*_square("d5")) is None
+
+    assert logic.undo()
+    assert _state(logic) == before
+    assert logic.board.get_piece(*_square("d5")).kind == "pawn"
+
+    assert logic.redo()
+    assert _state(logic) == after
+
+
+def test_en_passant_follows_the_last_move_through_undo():
+    logic = GameLogic()
+    _play(logic, "e2e4 a7a6 e4e5 d7d5 g1f3 h7h6")
+    pawn = logic.board.get_piece(*_square("e5"))
+    # The double step is no longer the last move
+    assert _square("d6") not in logic.legal_moves_for(pawn)
+
+    # last_move is rebuilt from the stack: the capture is possible again
+    logic.go_to_ply(4)
+    assert _square("d6") in logic.legal_moves_for(pawn)
+
+    # ... and gone once the double step itself is undone
+    logic.undo()
+    _play(logic, "h7h6")
+    assert _square("d6") not in logic.legal_moves_for(pawn)
+    assert logic.apply_move(_square("e5"), _square("d6")) is None
+
+
+def test_undo_redo_promotion_with_capture():
+    logic = GameLogic()
+    _play(logic, "a2a4 b7b5 a4b5 a7a6 b5a6 h7h6 a6a7 h6h5")
+    before = _state(logic)
+
+    _play(logic, "a7b8n")
+    after = _state(logic)
+    assert logic.board.get_piece(*_square("b8")).kind == "knight"
+
+    assert logic.undo()
+    assert _state(logic) == before
+    assert logic.board.get_piece(*_square("a7")).kind == "pawn"
+    assert logic.board.get_piece(*_square("b8")).color == "black"
+
+    assert logic.redo()
+    assert _state(logic) == after
+
+
+def test_threefold_repetition_after_go_to_ply():
+    logic = GameLogic()
+    shuffle = "g1f3 g8f6 f3g1 f6g8 " * 2
+    _play(logic, shuffle)
+    assert logic.result == ("draw", None)
+
+    logic.go_to_ply(4)
+    assert not logic.game_over
+    assert logic.move_stack.repetitions(logic.halfmove_clock) == 2
+
+    # Back to the end: the third occurrence is a draw again
+    logic.go_to_ply(8)
+    assert logic.result == ("draw", None)
+
+    # A different move at ply 4 discards the undone plies and their positions
+    logic.go_to_ply(4)
+    _play(logic, "b1c3")
+    assert len(logic.move_stack) == 5 and not logic.redo()
+    assert logic.move_stack.repetitions(logic.halfmove_clock) == 1
+    # Coming back to the start position is its third occurrence (plies 0, 4 and 8)
+    _play(logic, "b8c6 c3b1")
+    assert not logic.game_over
+    _play(logic, "c6b8")
+    assert logic.result == ("draw", None)
+
+
+def test_go_to_ply_round_trip_of_random_games():
+    rng = random.Random(7)
+    for _ in range(10):
+        logic = GameLogic()
+        states = [_state(logic)]
+        while not logic.game_over and len(states) < 80:
+            moves = [
+                (origin, target)
+                for origin, targets in logic.all_legal_moves().items()
+                for target in targets
+            ]
+            origin, target = rng.choice(moves)
+            logic.apply_move(origin, target, rng.choice(["queen", "knight"]))
+            states.append(_state(logic))
+
+        end = len(states) - 1
+        logic.go_to_ply(0)
+        assert _state(logic) == states[0]
+        for ply in (end // 2, end, 1, end - 1):
+            logic.go_to_ply(ply)
+            assert _state(logic) == states[ply]
+
+
+def _board_identity(logic: GameLogic) -> tuple:
+    """The exact piece objects on each square, with their own bookkeeping."""
+
+    return tuple(
+        None if piece is None else (id(piece), piece.position, piece.has_moved)
+        for row in logic.board.board
+        for piece in row
+    )
+
+
+def _checks_leave_the_board_alone(logic: GameLogic) -> None:
+    before = _board_identity(logic)
+    logic.all_legal_moves()
+    for row in range(8):
+        for col in range(8):
+            piece = logic.board.get_piece(row, col)
+            if piece is not None:
+                for target in piece.valid_moves(logic.board):
+                    logic._move_leaves_king_in_check(piece, *target)
+    assert _board_identity(logic) == before
+
+
+def test_pinned_piece_cannot_move_and_the_board_is_restored():
+    logic = GameLogic()
+    # Bb4 pins the c3 knight to the e1 king
+    _play(logic, "e2e4 e7e6 d2d4 f8b4 b1c3 g8f6")
+    before = _board_identity(logic)
+
+    assert logic.legal_moves_for(logic.board.get_piece(*_square("c3"))) == []
+    assert logic.apply_move(_square("c3"), _square("d5")) is None
+    assert _board_identity(logic) == before
+    _checks_leave_the_board_alone(logic)
+
+
+def test_en_passant_check_test_restores_both_pawns():
+    logic = GameLogic()
+    _play(logic, "e2e4 a7a6 e4e5 d7d5")
+    before = _board_identity(logic)
+
+    assert _square("d6") in logic.legal_moves_for(logic.board.get_piece(*_square("e5")))
+    assert _board_identity(logic) == before
+    _checks_leave_the_board_alone(logic)
+
+
+def test_en_passant_that_exposes_the_king_on_the_rank_is_illegal():
+    logic = GameLogic()
+    for row in range(8):
+        for col in range(8):
+            logic.board.remove_piece(row, col)
+    logic.board.place_piece(King("white"), *_square("a5"))
+    logic.board.place_piece(Pawn("white"), *_square("e5"))
+    logic.board.place_piece(Pawn("black"), *_square("d7"))
+    logic.board.place_piece(Rook("black"), *_square("h5"))
+    logic.board.place_piece(King("black"), *_square("h8"))
+    for piece in (logic.board.get_piece(*_square("a5")), logic.board.get_piece(*_square("e5"))):
+        piece.has_moved = True
+    logic.current_turn = "black"
+    _play(logic, "d7d5")
+    before = _board_identity(logic)
+
+    # Taking en passant would empty the fifth rank between the rook and the king
+    assert _square("d6") not in logic.legal_moves_for(logic.board.get_piece(*_square("e5")))
+    assert logic.apply_move(_square("e5"), _square("d6")) is None
+    assert _board_identity(logic) == before
+    _checks_leave_the_board_alone(logic)
+
+
+def test_castling_through_check_is_refused_and_the_board_is_restored():
+    logic = GameLogic()
+    # The a6 bishop covers f1, the square the king crosses
+    _play(logic, "e2e4 b7b6 g2g3 c8a6 f1h3 e7e6 g1f3 d7d6")
+    before = _board_identity(logic)
+
+    king = logic.board.get_piece(*_square("e1"))
+    assert _square("g1") not in logic.legal_moves_for(king)
+    assert logic.apply_move(_square("e1"), _square("g1")) is None
+    assert _board_identity(logic) == before
+    _checks_leave_the_board_alone(logic)
+
+
+def test_move_result_of_a_check():
+    logic = GameLogic()
+    _play(logic, "e2e4 d7d5")
+    result = logic.apply_move(_square("f1"), _square("b5"))
+
+    assert result.piece_kind == "bishop" and result.color == "white"
+    assert result.check and not result.game_over
+    assert not result.capture and not result.castling and not result.en_passant
+
+
+def test_move_result_of_a_mate():
+    logic = GameLogic()
+    _play(logic, "f2f3 e7e5 g2g4")
+    result = logic.apply_move(_square("d8"), _square("h4"))
+
+    assert result.check and result.game_over
+    assert logic.result == ("checkmate", "black")
+
+
+def test_move_result_of_a_promotion():
+    logic = GameLogic()
+    _play(logic, "a2a4 b7b5 a4b5 a7a6 b5a6 h7h6 a6a7 h6h5")
+    before = _board_identity(logic)
+    # No choice given: the promotion waits for the UI
+    pending = logic.apply_move(_square("a7"), _square("b8"))
+    assert pending.promotion is None and pending.capture and not pending.check
+    assert logic.pending_promotion == ("white", 0, 1)
+
+    logic.undo()
+    # Undo puts a new knight on b8 (rank 8); every other square keeps its piece
+    assert _board_identity(logic)[8:] == before[8:]
+    result = logic.apply_move(_square("a7"), _square("b8"), "queen")
+    assert result.promotion == "queen" and result.capture
+    assert not result.check and not result.game_over
+    assert logic.board.get_piece(*_square("b8")).kind == "queen"
+    assert logic.current_turn == "black"
+
+
+def test_castling_move_result():
+    logic = GameLogic()
+    _play(logic, "e2e4 e7e5 g1f3 b8c6 f1c4 g8f6")
+    result = logic.apply_move(_square("e1"), _square("g1"))
+
+    assert result.castling and result.piece_kind == "king" and not result.check
+    assert logic.board.get_piece(*_square("f1")).kind == "rook"
+
+
+def test_en_passant_move_result():
+    logic = GameLogic()
+    _play(logic, "e2e4 a7a6 e4e5 d7d5")
+    result = logic.apply_move(_square("e5"), _square("d6"))
+
+    assert result.en_passant and result.capture
@@ -0,0 +1,127 @@
+from src.server.matchmaking import (
+    BASE_RATING_WINDOW,
+    MAX_RATING_WINDOW,
+    RATING_WINDOW_GROWTH,
+    Matchmaker,
+    MatchmakingPool,
+    WaitingPlayer,
+    rating_window,
+)
+
+
+BLITZ = (180.0, 2.0)
+RAPID = (600.0, 5.0)
+
+
+def _player(key: str, rating: int, since: float = 0.0, time_control=BLITZ) -> WaitingPlayer:
+    return WaitingPlayer(key, rating, time_control, since)
+
+
+def _pool(*players: WaitingPlayer) -> MatchmakingPool:
+    pool = MatchmakingPool()
+    for player in players:
+        pool.add(player)
+    return pool
+
+
+def test_rating_window_grows_up_to_the_cap():
+    assert rating_window(0.0) == BASE_RATING_WINDOW
+    assert rating_window(2.0) == BASE_RATING_WINDOW + 2 * RATING_WINDOW_GROWTH
+    assert rating_window(10_000.0) == MAX_RATING_WINDOW
+
+
+def test_pairing_at_the_window_boundary():
+    pool = _pool(_player("low", 1500), _player("high", 1500 + BASE_RATING_WINDOW + 1))
+
+    assert pool.find_match(1500 - BASE_RATING_WINDOW, 0.0, 0.0).key == "low"
+    assert pool.find_match(1500 + BASE_RATING_WINDOW + 1 + BASE_RATING_WINDOW, 0.0, 0.0).key == "high"
+    assert pool.find_match(1500 - BASE_RATING_WINDOW - 1, 0.0, 0.0) is None
+
+
+def test_nearest_rating_wins_and_ties_go_down():
+    pool = _pool(_player("1450", 1450), _player("1550", 1550), _player("1560", 1560))
+
+    assert pool.find_match(1557, 0.0, 0.0).key == "1560"
+    assert pool.find_match(1530, 0.0, 0.0).key == "1550"
+    # Exactly between two buckets: the lower one is tried first
+    assert pool.find_match(1500, 0.0, 0.0).key == "1450"
+    assert pool.find_match(1500, 0.0, 0.0, exclude="1450").key == "1550"
+
+
+def test_oldest_player_of_a_bucket_is_matched_first():
+    pool = _pool(_player("first", 1500, since=1.0), _player("second", 1500, since=2.0))
+
+    assert pool.find_match(1500, 0.0, 3.0).key == "first"
+    pool.remove("first")
+    assert pool.find_match(1500, 0.0, 3.0).key == "second"
+
+
+def test_window_widens_while_players_wait():
+    # Too far apart to pair on arrival
+    difference = BASE_RATING_WINDOW + 5 * RATING_WINDOW_GROWTH
+    pool = _pool(_player("a", 1500, since=0.0), _player("b", 1500 + difference, since=3.0))
+    assert pool.find_match(1500 + difference, 0.0, 3.0, exclude="b") is None
+
+    # a has waited 4 s, b 1 s: neither window is wide enough yet
+    assert pool.match_waiting(4.0) == []
+    assert len(pool) == 2
+
+    # a's window now covers the difference; b is accepted through it
+    [(first, second)] = pool.match_waiting(5.0)
+    assert {first.key, second.key} == {"a", "b"}
+    assert len(pool) == 0
+    assert pool.find_match(1500, MAX_RATING_WINDOW, 5.0) is None
+
+
+def test_never_pairs_beyond_the_maximum_window():
+    pool = _pool(_player("a", 1000), _player("b", 1000 + MAX_RATING_WINDOW + 1))
+    assert pool.match_waiting(10_000.0) == []
+
+
+def test_removing_a_waiter_updates_the_buckets():
+    pool = _pool(_player("a", 1500), _player("b", 1500), _player("c", 1600))
+
+    assert pool.remove("a").key == "a"
+    assert pool.remove("a") is None
+    assert "a" not in pool and len(pool) == 2
+    assert pool.find_match(1500, 0.0, 0.0).key == "b"
+
+    # Emptying a bucket removes its rating: the next lookup skips to 1600
+    pool.remove("b")
+    assert pool._ratings == [1600]
+    assert pool.find_match(1500, 0.0, 0.0).key == "c"
+
+    pool.remove("c")
+    assert pool.match_waiting(10_000.0) == [] and pool._ratings == []
+
+
+def test_matchmaker_keeps_time_controls_apart():
+    matchmaker = Matchmaker()
+    assert matchmaker.pair(_player("blitz", 1500), 0.0) is None
+    assert matchmaker.pair(_player("rapid", 1500, time_control=RAPID), 0.0) is None
+    assert len(matchmaker) == 2
+
+    opponent = matchmaker.pair(_player("blitz-2", 1520), 1.0)
+    assert opponent.key == "blitz"
+    assert "blitz" not in matchmaker and "blitz-2" not in matchmaker
+
+
+def test_cancelled_waiter_is_never_matched():
+    matchmaker = Matchmaker()
+    matchmaker.pair(_player("cancelled", 1500), 0.0)
+    assert matchmaker.remove("cancelled").key == "cancelled"
+    assert matchmaker.remove("cancelled") is None
+
+    assert matchmaker.pair(_player("next", 1500), 1.0) is None
+    assert matchmaker.match_waiting(100.0) == []
+    assert "next" in matchmaker
+
+
+def test_matchmaker_drops_empty_pools():
+    matchmaker = Matchmaker()
+    matchmaker.pair(_player("a", 1500, since=0.0), 0.0)
+    matchmaker.pair(_player("b", 1500 + MAX_RATING_WINDOW, since=0.0), 0.0)
+
+    [(first, second)] = matchmaker.match_waiting(1000.0)
+    assert {first.key, second.key} == {"a", "b"}
+    assert matchmaker.pools == {} and len(matchmaker) == 0
@@ -0,0 +1,88 @@
+import pytest
+
+from src.chess.move_stack import MoveRecord, MoveStack, pack_move, unpack_move
+
+
+def _record(**fields) -> MoveRecord:
+    defaults = dict(
+        from_square=52,
+        to_square=36,
+        kind="pawn",
+        color="white",
+        captured=None,
+        promotion=None,
+        castling=False,
+        en_passant=False,
+        had_moved=False,
+        captured_had_moved=False,
+        halfmove_clock=0,
+    )
+    defaults.update(fields)
+    return MoveRecord(**defaults)
+
+
+@pytest.mark.parametrize(
+    "record",
+    [
+        # e2e4
+        _record(),
+        # Nb8xc6 by Black after the knight already moved, late in a quiet phase
+        _record(from_square=1, to_square=18, kind="knight", color="black",
+                captured="bishop", had_moved=True, captured_had_moved=True, halfmove_clock=37),
+        # a7xb8=N
+        _record(from_square=8, to_square=1, captured="rook", promotion="knight", had_moved=True),
+        # e8=Q without capture
+        _record(from_square=12, to_square=4, promotion="queen", had_moved=True),
+        # White O-O and Black O-O-O
+        _record(from_square=60, to_square=62, kind="king", castling=True, halfmove_clock=5),
+        _record(from_square=4, to_square=2, kind="king", color="black", castling=True),
+        # e5xd6 en passant
+        _record(from_square=28, to_square=19, captured="pawn", en_passant=True,
+                had_moved=True, captured_had_moved=True),
+        # Corner squares and the largest halfmove clock that fits
+        _record(from_square=63, to_square=0, kind="queen", color="black", had_moved=True,
+                halfmove_clock=255),
+    ],
+)
+def test_pack_unpack_round_trip(record):
+    assert unpack_move(pack_move(record)) == record
+
+
+def test_pack_fits_in_34_bits():
+    record = _record(from_square=63, to_square=63, kind="king", color="black", captured="queen",
+                     promotion="queen", castling=True, en_passant=True, had_moved=True,
+                     captured_had_moved=True, halfmove_clock=255)
+    assert pack_move(record) < 1 << 34
+
+
+def test_halfmove_clock_saturates():
+    assert unpack_move(pack_move(_record(halfmove_clock=300))).halfmove_clock == 255
+
+
+def test_push_after_undo_keeps_or_drops_the_redo_line():
+    stack = MoveStack(start_hash=0)
+    first = pack_move(_record())
+    second = pack_move(_record(from_square=12, to_square=28, color="black"))
+    stack.push(first, 1)
+    stack.push(second, 2)
+
+    stack.undo()
+    # Playing the undone move again keeps it (and anything after it) redoable
+    stack.push(second, 2)
+    assert stack.ply == 2 and len(stack) == 2
+
+    stack.undo()
+    other = pack_move(_record(from_square=11, to_square=27, color="black"))
+    stack.push(other, 3)
+    assert stack.ply == 2 and len(stack) == 2
+    assert not stack.can_redo() and stack.last().from_square == 11
+    assert list(stack.hashes) == [0, 1, 3]
+
+
+def test_repetitions_only_count_since_the_last_irreversible_move():
+    stack = MoveStack(start_hash=7)
+    for position_hash in (1, 7, 1, 7):
+        stack.push(pack_move(_record()), position_hash)
+
+    assert stack.repetitions(halfmove_clock=4) == 3
+    assert stack.repetitions(halfmove_clock=2) == 2
@@ -0,0 +1,90 @@
+import json
+from queue import Empty
+
+import pytest
+
+from src.core.chess_session import OnlineChessSession
+
+
+class RecordingApp:
+    """WebSocketApp stand-in that records what the session sends."""
+
+    def __init__(self) -> None:
+        self.sent: list[dict] = []
+
+    def send(self, text: str) -> None:
+        self.sent.append(json.loads(text))
+
+
+@pytest.fixture
+def session(monkeypatch):
+    """A matched White session that is reconnecting, without any network thread."""
+
+    monkeypatch.setattr(OnlineChessSession, "_run", lambda self: None)
+    session = OnlineChessSession("ws://test/ws")
+    session._ws_app = RecordingApp()
+
+    session._on_message(None, json.dumps({
+        "type": "match_found", "room_id": "room", "color": "white", "resume_token": "token",
+    }))
+    # White moved (acked as seq 1), Black answered (seq 2)
+    session._on_message(None, json.dumps({"type": "ack", "seq": 1}))
+    session._on_message(None, json.dumps({
+        "type": "move", "from": [1, 4], "to": [3, 4], "color": "black", "seq": 2,
+    }))
+    _drain(session)
+
+    session.connection_status = "reconnecting"
+    return session
+
+
+def _drain(session: OnlineChessSession) -> list[dict]:
+    messages = []
+    while True:
+        try:
+            messages.append(session._inbound_messages.get_nowait())
+        except Empty:
+            return messages
+
+
+def _receive(session: OnlineChessSession, **data) -> None:
+    session._on_message(None, json.dumps(data))
+
+
+def test_resume_with_nothing_missed(session):
+    # A move sent while the connection was down, never acknowledged
+    session._unacked.append({"type": "move", "from": [6, 3], "to": [4, 3]})
+
+    _receive(session, type="resumed", room_id="room", color="white", last_seq=2)
+
+    assert session.connection_status == "matched"
+    assert session.last_seq == 2
+    assert [message["type"] for message in _drain(session)] == ["resumed"]
+    # The server never got the move: it is sent again
+    assert [(sent["from"], sent["to"]) for sent in session._ws_app.sent] == [([6, 3], [4, 3])]
+
+
+def test_resume_replays_the_missed_messages(session):
+    session._unacked.append({"type": "move", "from": [6, 3], "to": [4, 3]})
+
+    _receive(session, type="resumed", room_id="room", color="white", last_seq=4)
+    assert session.connection_status == "matched"
+    # Nothing is resent before the delta shows whether the server got it
+    assert session._ws_app.sent == []
+
+    # The delta: our own move (the server did get it), then Black's answer
+    _receive(session, type="move", **{"from": [6, 3], "to": [4, 3]}, color="white", seq=3)
+    _receive(session, type="move", **{"from": [0, 6], "to": [2, 5]}, color="black", seq=4)
+
+    messages = _drain(session)
+    assert [(message["type"], message.get("seq")) for message in messages] == [
+        ("resumed", None),
+        ("move", 3),
+        ("move", 4),
+    ]
+    assert session.last_seq == 4
+    assert not session._unacked and session._ws_app.sent == []
+
+    # A duplicate delivery of the delta is still ignored
+    _receive(session, type="move", **{"from": [0, 6], "to": [2, 5]}, color="black", seq=4)
+    assert _drain(session) == []
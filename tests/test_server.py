@@ -0,0 +1,232 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from src.server import main
+from src.server.clock import GameClock, TimingWheel
+from src.server.connection import Connection
+from src.server.room import Room
+
+
+class RecordingSocket:
+    """Websocket stand-in that accepts every message at once."""
+
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+        self.closed_with: int | None = None
+
+    async def send_text(self, text: str) -> None:
+        self.sent.append(text)
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed_with = code
+
+
+class StalledSocket(RecordingSocket):
+    """Websocket stand-in for a peer that stopped reading."""
+
+    async def send_text(self, text: str) -> None:
+        await asyncio.Event().wait()
+
+
+@pytest.fixture(autouse=True)
+def server_state(monkeypatch):
+    """Fresh module-level server state for every test."""
+
+    monkeypatch.setattr(main, "connections", set())
+    monkeypatch.setattr(main, "rooms", {})
+    monkeypatch.setattr(main, "room_of", {})
+    monkeypatch.setattr(main, "watching", {})
+    monkeypatch.setattr(main, "resume_tokens", {})
+    monkeypatch.setattr(main, "clock_wheel", TimingWheel(time.monotonic()))
+    monkeypatch.setattr(main.archive, "submit", lambda record: None)
+
+
+def _connect(socket: RecordingSocket, **limits) -> Connection:
+    connection = Connection(socket, on_drop=main._disconnect, **limits)
+    connection.start()
+    main.connections.add(connection)
+    return connection
+
+
+def _stalled_connection() -> Connection:
+    """A connection whose one-slot queue is already full: the next send evicts it."""
+
+    connection = _connect(StalledSocket(), max_queue=1)
+    connection.send_text("backlog")
+    return connection
+
+
+def _room(clock: GameClock | None = None) -> tuple[Room, Connection, Connection]:
+    white, black = _connect(RecordingSocket()), _connect(RecordingSocket())
+    room = Room("room", white, black, clock)
+    main.rooms[room.room_id] = room
+    main.room_of[white] = room
+    main.room_of[black] = room
+    return room, white, black
+
+
+def _watch(room: Room, connection: Connection) -> None:
+    room.spectators.add(connection)
+    main.watching[connection] = room
+
+
+def test_stalled_spectator_is_evicted_while_a_move_is_relayed():
+    async def scenario():
+        room, white, black = _room(GameClock(60.0, 0.0))
+        stalled = _stalled_connection()
+        _watch(room, _connect(RecordingSocket()))
+        _watch(room, stalled)
+        # Let the stalled writer pick up its backlog, so the queue has room for one more
+        await asyncio.sleep(0)
+        stalled.send_text("backlog")
+
+        # What websocket_endpoint does with a move from White
+        data = {"type": "move", "from": [6, 4], "to": [4, 4]}
+        text = main._relay_text(room, white, data, time.perf_counter())
+        for player in room.opponents_of(white):
+            player.send_text(text)
+        main._broadcast(room.spectators, text)
+        await asyncio.sleep(0)
+        return room, white, black, stalled
+
+    room, white, black, stalled = asyncio.run(scenario())
+
+    assert stalled.closed and stalled not in room.spectators
+    assert stalled not in main.watching
+    assert not white.closed and not black.closed
+    assert main.room_of[white] is room
+    assert len(room.spectators) == 1
+
+
+def test_flag_survives_a_spectator_evicted_by_the_flag_message():
+    async def scenario():
+        room, white, black = _room(GameClock(1.0, 0.0))
+        stalled = _stalled_connection()
+        _watch(room, stalled)
+        await asyncio.sleep(0)
+        stalled.send_text("backlog")
+
+        now = time.monotonic()
+        room.clock.press("white", now - 2.0)
+        main.clock_wheel.schedule(room.room_id, room.clock.deadline())
+        main._check_flags(now + 1.0)
+        return room, stalled
+
+    room, stalled = asyncio.run(scenario())
+
+    assert room.result == ("timeout", "white")
+    assert stalled.closed and not room.spectators
+
+
+def test_resume_announces_the_delta_outside_the_sequence():
+    async def scenario():
+        room, white, black = _room(GameClock(60.0, 0.0))
+        main.resume_tokens.update(dict.fromkeys(room.tokens, room))
+        for move in ({"from": [6, 4], "to": [4, 4]}, {"from": [1, 4], "to": [3, 4]}):
+            mover = white if room.seq % 2 == 0 else black
+            main._relay_text(room, mover, {"type": "move", **move}, time.perf_counter())
+
+        socket = RecordingSocket()
+        reconnected = _connect(socket)
+        assert main._resume(reconnected, room.token_for("white"), last_seq=1)
+        await asyncio.sleep(0)
+        return socket
+
+    socket = asyncio.run(scenario())
+    messages = [json.loads(text) for text in socket.sent]
+
+    assert messages[0]["type"] == "resumed"
+    assert messages[0]["last_seq"] == 2 and "seq" not in messages[0]
+    assert [message["seq"] for message in messages[1:]] == [2]
+
+
+def test_sweep_survives_a_ping_that_evicts_a_stalled_client():
+    async def scenario():
+        stalled = _stalled_connection()
+        alive = _connect(RecordingSocket())
+        await asyncio.sleep(0)
+        stalled.send_text("backlog")
+
+        main._sweep()
+        await asyncio.sleep(0)
+        return stalled, alive
+
+    stalled, alive = asyncio.run(scenario())
+
+    assert stalled.closed and main.connections == {alive}
+    assert alive.websocket.sent == [main.PING_TEXT]
+
+
+def _move(room: Room, mover: Connection, move: dict) -> str | None:
+    return main._relay_text(room, mover, {"type": "move", **move}, time.perf_counter())
+
+
+def test_each_move_reschedules_the_flag():
+    async def scenario():
+        # The increment puts White's next deadline well after Black's first one
+        room, white, black = _room(GameClock(60.0, 30.0))
+        _move(room, white, {"from": [6, 4], "to": [4, 4]})
+        first_deadline = room.clock.deadline()
+        await asyncio.sleep(0.01)
+        _move(room, black, {"from": [1, 4], "to": [3, 4]})
+        return room, first_deadline
+
+    room, first_deadline = asyncio.run(scenario())
+
+    assert len(main.clock_wheel) == 1
+    # Black's old deadline passed without a flag: the entry moved to White's
+    main._check_flags(first_deadline + 0.2)
+    assert room.result is None
+    main._check_flags(room.clock.deadline() + 0.2)
+    assert room.result == ("timeout", "black")
+
+
+def test_move_after_the_deadline_is_flagged_and_dropped():
+    async def scenario():
+        room, white, black = _room(GameClock(1.0, 5.0))
+        _move(room, white, {"from": [6, 4], "to": [4, 4]})
+        # Black ran out of time, and the wheel has not ticked yet
+        room.clock.turn_started_at -= 1.05
+        text = _move(room, black, {"from": [1, 4], "to": [3, 4]})
+        await asyncio.sleep(0)
+        return room, white, text
+
+    room, white, text = asyncio.run(scenario())
+
+    assert text is None
+    assert room.result == ("timeout", "white")
+    assert room.clock.remaining["black"] == 0.0
+    assert len(main.clock_wheel) == 0
+    assert json.loads(white.websocket.sent[-1])["type"] == "flag"
+
+
+def test_game_over_stops_the_clock():
+    from fastapi.testclient import TestClient
+
+    client = TestClient(main.app)
+    with client.websocket_connect("/ws?player=a") as first, \
+            client.websocket_connect("/ws?player=b") as second:
+        assert first.receive_json()["type"] == "waiting_for_opponent"
+        colors = {first.receive_json()["color"]: first, second.receive_json()["color"]: second}
+        white, black = colors["white"], colors["black"]
+
+        white.send_json({"type": "move", "from": [6, 4], "to": [4, 4]})
+        assert white.receive_json()["type"] == "ack"
+        assert black.receive_json()["type"] == "move"
+        room = next(iter(main.rooms.values()))
+        assert room.clock.running and len(main.clock_wheel) == 1
+
+        white.send_json({"type": "game_over", "reason": "resign", "winner": "white"})
+        # The ping is answered after the game_over was handled
+        black.send_json({"type": "ping", "t": 0})
+        white.send_json({"type": "ping", "t": 0})
+        assert white.receive_json()["type"] == "pong"
+
+        assert room.result == ("resign", "white")
+        assert not room.clock.running and len(main.clock_wheel) == 0
+        # Even far past Black's deadline the finished game is not flagged
+        main._check_flags(time.monotonic() + 3600)
+        assert room.result == ("resign", "white")